@@ -0,0 +1,166 @@
+import numpy as np
+
+from pong_sim import (AI_X, BALL_RADIUS, BALL_SPEED, HEIGHT, PADDLE_HEIGHT, PADDLE_SPEED,
+                      PADDLE_WIDTH, PLAYER_X, SPIN_FACTOR, TIME_SCALE_RAMP, WIDTH, WIN_SCORE)
+
+class BatchPongEnv:
+    """Many independent SuperHot Pong matches stepped together with NumPy.
+
+    Each field of the match state is one array with an entry per match, and
+    every step applies the game's one-tick rules to all matches at once,
+    including pong_sim's ramped SuperHot time scale (but with overlap tests
+    after moving, rather than pong_sim's swept collisions).
+    The interface follows gym's vector environments: reset() returns
+    observations, step(actions) returns (observations, rewards, dones, info),
+    and finished matches are reset automatically.
+
+    ai is a pong_sim.PredictiveAI shared by every match, or None for the
+    original ball-chasing AI.
+    """
+
+    # Columns of the observation array
+    OBSERVATION_FIELDS = ('ball_x', 'ball_y', 'ball_dx', 'ball_dy', 'player_y', 'ai_y')
+
+    def __init__(self, num_envs, seed=None, ai=None):
+        self.num_envs = num_envs
+        self.ai = ai
+        self.rng = np.random.default_rng(seed)
+        self.ball_x = np.zeros(num_envs)
+        self.ball_y = np.zeros(num_envs)
+        self.ball_dx = np.zeros(num_envs)
+        self.ball_dy = np.zeros(num_envs)
+        self.player_y = np.zeros(num_envs)
+        self.ai_y = np.zeros(num_envs)
+        self.player_score = np.zeros(num_envs, dtype=np.int32)
+        self.ai_score = np.zeros(num_envs, dtype=np.int32)
+        self.ticks = np.zeros(num_envs, dtype=np.int64)
+        self.time_scale = np.zeros(num_envs)   # Ball speed, 0 (stopped) to 1, as in pong_sim
+        # Predictive AI: cached target (NaN while unknown), the velocity it was
+        # computed for and the reaction ticks still to wait
+        self.ai_target = np.full(num_envs, np.nan)
+        self.ai_velocity = np.zeros((num_envs, 2))
+        self.ai_wait = np.zeros(num_envs, dtype=np.int64)
+
+    def _serve(self, mask):
+        """Put the ball back in the middle of the matches selected by mask."""
+        count = int(mask.sum())
+        self.ball_x[mask] = WIDTH // 2
+        self.ball_y[mask] = HEIGHT // 2
+        self.ball_dx[mask] = BALL_SPEED * self.rng.choice((-1, 1), count)
+        self.ball_dy[mask] = BALL_SPEED * self.rng.choice((-1, 1), count)
+
+    def _reset_matches(self, mask):
+        """Start new matches in the slots selected by mask."""
+        self.player_y[mask] = HEIGHT // 2 - PADDLE_HEIGHT // 2
+        self.ai_y[mask] = HEIGHT // 2 - PADDLE_HEIGHT // 2
+        self.player_score[mask] = 0
+        self.ai_score[mask] = 0
+        self.ticks[mask] = 0
+        self.time_scale[mask] = 0.0
+        self.ai_target[mask] = np.nan
+        self.ai_velocity[mask] = 0
+        self.ai_wait[mask] = 0
+        self._serve(mask)
+
+    def reset(self):
+        """Start every match afresh and return the observations."""
+        self._reset_matches(np.ones(self.num_envs, dtype=bool))
+        return self.observe()
+
+    def observe(self):
+        """Return a (num_envs, 6) float32 array with the OBSERVATION_FIELDS of each match."""
+        return np.stack([getattr(self, name) for name in self.OBSERVATION_FIELDS], axis=1).astype(np.float32)
+
+    def _apply_spin(self, mask, paddle_y):
+        """Reverse and spin the ball in the matches selected by mask."""
+        normalized_impact = (self.ball_y - (paddle_y + PADDLE_HEIGHT // 2)) / (PADDLE_HEIGHT // 2)
+        self.ball_dx = np.where(mask, -self.ball_dx, self.ball_dx)
+        self.ball_dy = np.where(mask, self.ball_dy + normalized_impact * SPIN_FACTOR, self.ball_dy)
+
+    def _predictive_ai_dy(self):
+        """Return each AI paddle's move towards its predicted intercept, updating the cached targets."""
+        ai = self.ai
+        velocity = np.stack([self.ball_dx, np.abs(self.ball_dy)], axis=1)
+        changed = (velocity != self.ai_velocity).any(1)
+        self.ai_velocity[changed] = velocity[changed]
+        self.ai_target[changed] = np.nan
+        self.ai_wait[changed] = ai.reaction_ticks
+
+        pending = np.isnan(self.ai_target)
+        waiting = pending & (self.ai_wait > 0)
+        self.ai_wait[waiting] -= 1
+        aim = np.flatnonzero(pending & ~waiting)
+        if len(aim):
+            # Same wall folding as pong_sim.predict_intercept, for many balls at once
+            x, y, dx, dy = self.ball_x[aim], self.ball_y[aim], self.ball_dx[aim], self.ball_dy[aim]
+            target_x = AI_X - BALL_RADIUS
+            low, span = BALL_RADIUS, HEIGHT - 2 * BALL_RADIUS
+            with np.errstate(divide='ignore', invalid='ignore'):
+                offset = (y + dy * (target_x - x) / dx - low) % (2 * span)
+            target = low + np.where(offset <= span, offset, 2 * span - offset)
+            incoming = (dx > 0) & (x <= target_x)
+            if ai.error:
+                target += self.rng.uniform(-ai.error, ai.error, len(aim))
+            self.ai_target[aim] = np.where(incoming, target, HEIGHT / 2)
+
+        gap = self.ai_target - (self.ai_y + PADDLE_HEIGHT / 2)
+        return np.where(np.isnan(gap), 0, np.clip(gap, -PADDLE_SPEED, PADDLE_SPEED))
+
+    def step(self, actions):
+        """Advance every match by one tick.
+
+        actions holds each player's move (-1 up, 0 stay, 1 down). Rewards are
+        +1 when the player scores and -1 when the AI does; dones marks matches
+        that were won this tick, which are then reset. info['winner'] is +1 for
+        a player win, -1 for an AI win and 0 otherwise.
+        """
+        actions = np.asarray(actions)
+        self.ticks += 1
+        self.player_y = np.clip(self.player_y + actions * PADDLE_SPEED, 0, HEIGHT - PADDLE_HEIGHT)
+
+        # SuperHot: the ball speeds up while the player moves and slows to a stop
+        # when they don't; one tick of pong_sim.ramp_time_scale for every match
+        scale = self.time_scale
+        target = (actions != 0).astype(float)
+        reach = np.abs(target - scale) / TIME_SCALE_RAMP
+        ramped = scale + np.copysign(TIME_SCALE_RAMP, target - scale)
+        self.time_scale = np.where(reach >= 1, ramped, target)
+        ball_ticks = np.where(reach >= 1, (scale + ramped) / 2,
+                              reach * (scale + target) / 2 + (1 - reach) * target)
+        moving = ball_ticks > 0
+        self.ball_x = self.ball_x + self.ball_dx * ball_ticks
+        self.ball_y = self.ball_y + self.ball_dy * ball_ticks
+        wall = moving & ((self.ball_y - BALL_RADIUS <= 0) | (self.ball_y + BALL_RADIUS >= HEIGHT))
+        self.ball_dy = np.where(wall, -self.ball_dy, self.ball_dy)
+
+        # AI paddles chase the ball, or head for its predicted intercept
+        if self.ai is None:
+            ai_dy = np.clip(self.ball_y - (self.ai_y + PADDLE_HEIGHT / 2), -PADDLE_SPEED, PADDLE_SPEED)
+        else:
+            ai_dy = self._predictive_ai_dy()
+        self.ai_y = np.clip(self.ai_y + ai_dy, 0, HEIGHT - PADDLE_HEIGHT)
+
+        # Paddle collisions
+        hit = ((self.ball_x - BALL_RADIUS <= PLAYER_X + PADDLE_WIDTH) &
+               (self.player_y < self.ball_y) & (self.ball_y < self.player_y + PADDLE_HEIGHT))
+        self._apply_spin(hit, self.player_y)
+        hit = ((self.ball_x + BALL_RADIUS >= AI_X) &
+               (self.ai_y < self.ball_y) & (self.ball_y < self.ai_y + PADDLE_HEIGHT))
+        self._apply_spin(hit, self.ai_y)
+
+        # Scoring
+        rewards = np.zeros(self.num_envs, dtype=np.float32)
+        ai_scored = self.ball_x - BALL_RADIUS <= 0
+        self.ai_score += ai_scored
+        rewards[ai_scored] = -1
+        self._serve(ai_scored)
+        player_scored = self.ball_x + BALL_RADIUS >= WIDTH
+        self.player_score += player_scored
+        rewards[player_scored] = 1
+        self._serve(player_scored)
+
+        winner = np.where(self.player_score == WIN_SCORE, 1, np.where(self.ai_score == WIN_SCORE, -1, 0))
+        dones = winner != 0
+        info = {'winner': winner, 'ticks': self.ticks.copy()}
+        self._reset_matches(dones)
+        return self.observe(), rewards, dones, info
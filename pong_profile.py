@@ -0,0 +1,80 @@
+import csv
+import json
+import time
+from collections import deque
+
+class FrameProfiler:
+    """Per-phase timings for the last capacity frames of the game loop.
+
+    Call start_frame() at the top of the loop, mark(phase) as each phase
+    finishes (the time since the previous mark is charged to it) and
+    end_frame() at the bottom. Frames are kept in a ring buffer, so memory
+    stays fixed however long the game runs.
+    """
+
+    PHASES = ('events', 'idle', 'input', 'simulate', 'draw', 'present')
+
+    def __init__(self, capacity=3600):
+        self.frames = deque(maxlen=capacity)   # (start time, ticks, *phase seconds)
+        self.index = {phase: k for k, phase in enumerate(self.PHASES)}
+        self.frame_count = 0
+        self.start = self.last = None
+        self.current = None
+
+    def start_frame(self):
+        """Begin timing a new frame."""
+        self.start = self.last = time.perf_counter()
+        self.current = [0.0] * len(self.PHASES)
+
+    def mark(self, phase):
+        """Charge the time since the previous mark (or the frame start) to phase."""
+        now = time.perf_counter()
+        self.current[self.index[phase]] += now - self.last
+        self.last = now
+
+    def end_frame(self, ticks=0):
+        """Store the frame, which ran ticks simulation ticks."""
+        self.frames.append((self.start, ticks, *self.current))
+        self.frame_count += 1
+
+    def recent(self, count):
+        """Return the last count frames, oldest first."""
+        return list(self.frames)[-count:]
+
+    def fps(self, count=60):
+        """Return the frame rate over the last count frames."""
+        frames = self.recent(count)
+        total = sum(sum(frame[2:]) for frame in frames)
+        return len(frames) / total if total else 0.0
+
+    def phase_means(self, count=60):
+        """Return {phase: mean milliseconds} over the last count frames."""
+        frames = self.recent(count)
+        if not frames:
+            return {phase: 0.0 for phase in self.PHASES}
+        return {phase: 1000 * sum(frame[2 + k] for frame in frames) / len(frames)
+                for k, phase in enumerate(self.PHASES)}
+
+    def dump(self, path):
+        """Write the buffered frames to path, as CSV or (for a .json path) JSON."""
+        origin = self.frames[0][0] if self.frames else 0.0
+        first = self.frame_count - len(self.frames)
+        rows = [[first + k, round(1000 * (start - origin), 3), ticks] +
+                [round(1000 * seconds, 4) for seconds in phases]
+                for k, (start, ticks, *phases) in enumerate(self.frames)]
+        columns = ['frame', 'start_ms', 'ticks'] + [f'{phase}_ms' for phase in self.PHASES]
+        if path.endswith('.json'):
+            totals = [sum(row[3:]) for row in rows]
+            summary = {
+                'frames': len(rows),
+                'fps': self.fps(len(rows)),
+                'mean_ms': self.phase_means(len(rows)),
+                'worst_frame_ms': max(totals, default=0.0),
+            }
+            with open(path, 'w') as f:
+                json.dump({'summary': summary, 'columns': columns, 'frames': rows}, f)
+        else:
+            with open(path, 'w', newline='') as f:
+                writer = csv.writer(f)
+                writer.writerow(columns)
+                writer.writerows(rows)
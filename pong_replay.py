@@ -0,0 +1,137 @@
+import argparse
+import hashlib
+import struct
+import time
+
+from pong_sim import PongState, PredictiveAI, advance, new_state
+
+# File layout: header, the player's moves as run-length varints, then a footer
+# recording how long the match ran and a digest of the state it ended in.
+# Each run is one varint holding (ticks << 2) | (move + 1).
+MAGIC = b"PONG"
+VERSION = 3
+HEADER = struct.Struct("<4sHIBid")   # magic, version, seed, has predictive AI, reaction ticks, error
+FOOTER = struct.Struct("<Q20s")      # ticks played, SHA-1 digest of the final state
+
+# State fields that make up the digest; the AI object itself is in the header
+DIGEST_FIELDS = tuple(name for name in PongState.__slots__ if name != 'ai')
+
+def state_digest(state):
+    """Return a SHA-1 digest of state, which matches only for bit-identical states."""
+    return hashlib.sha1(repr(tuple(getattr(state, name) for name in DIGEST_FIELDS)).encode()).digest()
+
+def encode_varint(value):
+    """Return value as a little-endian base-128 varint."""
+    out = bytearray()
+    while value >= 0x80:
+        out.append(value & 0x7F | 0x80)
+        value >>= 7
+    out.append(value)
+    return bytes(out)
+
+def decode_runs(data):
+    """Yield (move, ticks) for each run in an encoded move stream."""
+    value = shift = 0
+    for byte in data:
+        value |= (byte & 0x7F) << shift
+        shift += 7
+        if not byte & 0x80:
+            yield (value & 3) - 1, value >> 2
+            value = shift = 0
+
+class ReplayRecorder:
+    """Writes a match's seed, AI and per-tick moves to a replay file as it is played.
+
+    Consecutive identical moves are stored as one run, so a log is a few
+    bytes per change of input rather than a byte per tick.
+    """
+
+    def __init__(self, path, seed, ai=None):
+        self.file = open(path, "wb")
+        self.file.write(HEADER.pack(MAGIC, VERSION, seed & 0xFFFFFFFF, ai is not None,
+                                    ai.reaction_ticks if ai else 0, ai.error if ai else 0.0))
+        self.move = None
+        self.run = 0
+        self.ticks = 0
+
+    def record(self, move):
+        """Log the move made on one tick."""
+        self.ticks += 1
+        if move == self.move:
+            self.run += 1
+            return
+        self._flush()
+        self.move, self.run = move, 1
+
+    def _flush(self):
+        if self.run:
+            self.file.write(encode_varint((self.run << 2) | (self.move + 1)))
+
+    def close(self, state):
+        """Finish the log with the final state of the match and close the file."""
+        self._flush()
+        self.run = 0
+        self.file.write(FOOTER.pack(self.ticks, state_digest(state)))
+        self.file.close()
+
+class Replay:
+    """A recorded match: its seed, AI, moves and the digest of its final state."""
+
+    def __init__(self, seed, ai, moves, ticks, digest):
+        self.seed = seed
+        self.ai = ai
+        self.moves = moves    # Encoded move stream
+        self.ticks = ticks
+        self.digest = digest
+
+    @classmethod
+    def load(cls, path):
+        """Read a replay file written by ReplayRecorder."""
+        with open(path, "rb") as f:
+            data = f.read()
+        magic, version, seed, has_ai, reaction_ticks, error = HEADER.unpack_from(data)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path} is not a version {VERSION} Pong replay")
+        ticks, digest = FOOTER.unpack_from(data, len(data) - FOOTER.size)
+        ai = PredictiveAI(reaction_ticks, error) if has_ai else None
+        return cls(seed, ai, data[HEADER.size:len(data) - FOOTER.size], ticks, digest)
+
+    def new_state(self):
+        """Return the state the recorded match started from."""
+        return new_state(self.seed, self.ai)
+
+    def iter_moves(self):
+        """Yield the recorded move for each tick in order."""
+        for move, ticks in decode_runs(self.moves):
+            for _ in range(ticks):
+                yield move
+
+    def play(self):
+        """Replay the whole match headlessly and return its final state."""
+        state = self.new_state()
+        for move in self.iter_moves():
+            advance(state, move)
+        return state
+
+    def verify(self):
+        """Return True if replaying gives a state bit-identical to the recorded one."""
+        return state_digest(self.play()) == self.digest
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Replay recorded SuperHot Pong matches headlessly.")
+    parser.add_argument("paths", nargs="+", metavar="path", help="replay files written with --record")
+    args = parser.parse_args()
+
+    failed = False
+    for path in args.paths:
+        replay = Replay.load(path)
+        start = time.perf_counter()
+        state = replay.play()
+        elapsed = time.perf_counter() - start
+        ok = state_digest(state) == replay.digest
+        failed |= not ok
+        print(f"{path}: {state.tick} ticks, {state.player_score}-{state.ai_score}, "
+              f"winner {state.winner}, {state.tick / elapsed:.0f} ticks/s, "
+              f"{'identical' if ok else 'DIVERGED'}")
+    if failed:
+        raise SystemExit(1)
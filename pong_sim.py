@@ -0,0 +1,382 @@
+import math
+import random
+
+# Playing field and game constants, in pixels and pixels per tick
+WIDTH, HEIGHT = 800, 600
+PADDLE_WIDTH = 15
+PADDLE_HEIGHT = 100
+PADDLE_SPEED = 5
+PLAYER_X = 50
+AI_X = WIDTH - 65
+BALL_RADIUS = 10
+BALL_SPEED = 3
+SPIN_FACTOR = 1  # Adjust this to control spin intensity
+WIN_SCORE = 5
+
+# The simulation always advances in fixed ticks of DT seconds
+TICK_RATE = 60
+DT = 1 / TICK_RATE
+
+# Player inputs: which way the player's paddle moves this tick
+UP, STAY, DOWN = -1, 0, 1
+
+# Upper bound on bounces resolved within a single step
+MAX_BOUNCES = 16
+
+# SuperHot time scale: how far the ball's speed moves per tick towards full
+# (player moving) or stopped (player still); 1 switches instantly
+TIME_SCALE_RAMP = 0.2
+
+class PongState:
+    """Complete state of one match; the random generator state is part of it."""
+
+    __slots__ = ('player_y', 'ai_y', 'ball_x', 'ball_y', 'ball_dx', 'ball_dy',
+                 'player_score', 'ai_score', 'winner', 'tick', 'rng',
+                 'ai', 'ai_target', 'ai_velocity', 'ai_wait', 'time_scale')
+
+    def copy(self):
+        """Return an independent copy of this state."""
+        other = PongState()
+        for name in self.__slots__:
+            setattr(other, name, getattr(self, name))
+        return other
+
+    def __eq__(self, other):
+        return (isinstance(other, PongState) and
+                all(getattr(self, name) == getattr(other, name) for name in self.__slots__))
+
+    def __repr__(self):
+        fields = ", ".join(f"{name}={getattr(self, name)!r}" for name in self.__slots__)
+        return f"PongState({fields})"
+
+def next_random(rng):
+    """Advance a 32-bit xorshift generator state and return the new state."""
+    rng ^= (rng << 13) & 0xFFFFFFFF
+    rng ^= rng >> 17
+    rng ^= (rng << 5) & 0xFFFFFFFF
+    return rng
+
+def serve(state):
+    """Put the ball back in the middle with a random diagonal direction."""
+    state.rng = next_random(state.rng)
+    state.ball_x = WIDTH // 2
+    state.ball_y = HEIGHT // 2
+    state.ball_dx = BALL_SPEED * (1 if state.rng & 1 else -1)
+    state.ball_dy = BALL_SPEED * (1 if state.rng & 2 else -1)
+
+def new_state(seed=None, ai=None):
+    """Return the state at the start of a match; the same seed always gives the same match.
+
+    ai is a PredictiveAI for the opponent, or None for the original ball-chasing AI.
+    """
+    state = PongState()
+    state.ai = ai
+    state.ai_target = None
+    state.ai_velocity = None
+    state.ai_wait = 0
+    state.player_y = HEIGHT // 2 - PADDLE_HEIGHT // 2
+    state.ai_y = HEIGHT // 2 - PADDLE_HEIGHT // 2
+    state.player_score = 0
+    state.ai_score = 0
+    state.winner = None
+    state.tick = 0
+    state.time_scale = 0.0
+    seed = random.getrandbits(32) if seed is None else seed
+    state.rng = (seed & 0xFFFFFFFF) or 1  # xorshift must not start at zero
+    serve(state)
+    return state
+
+def move_paddle(y, dy):
+    """Return the paddle's new y after moving by dy, kept on the screen."""
+    return min(max(y + dy, 0), HEIGHT - PADDLE_HEIGHT)
+
+def apply_spin(ball_y, ball_dy, paddle_y):
+    """Return the ball's new dy after hitting the paddle at paddle_y."""
+    # Distance of the impact from the paddle centre, normalized to -1..1
+    paddle_center = paddle_y + PADDLE_HEIGHT // 2
+    normalized_impact = (ball_y - paddle_center) / (PADDLE_HEIGHT // 2)
+    return ball_dy + normalized_impact * SPIN_FACTOR
+
+def ai_move(ai_y, ball_y, ticks=1):
+    """Return the AI paddle's new y after ticks of chasing the ball, stopping level with it."""
+    gap = ball_y - (ai_y + PADDLE_HEIGHT / 2)
+    dy = max(-PADDLE_SPEED * ticks, min(PADDLE_SPEED * ticks, gap))
+    return move_paddle(ai_y, dy)
+
+def predict_intercept(x, y, dx, dy, target_x):
+    """Return the ball's y when its centre reaches target_x, or None if it is moving away.
+
+    Wall bounces are folded in analytically: the straight-line y is reflected
+    back into the band the ball's centre can occupy.
+    """
+    if dx == 0 or (target_x - x) * dx < 0:
+        return None
+    low, span = BALL_RADIUS, HEIGHT - 2 * BALL_RADIUS
+    offset = (y + dy * (target_x - x) / dx - low) % (2 * span)
+    return low + (offset if offset <= span else 2 * span - offset)
+
+# Reaction delay in ticks and aiming error in pixels for each predictive AI level
+AI_DIFFICULTIES = {
+    'easy': (20, 60),
+    'medium': (10, 30),
+    'hard': (4, 10),
+    'perfect': (0, 0),
+}
+
+class PredictiveAI:
+    """Opponent that heads for where the ball will cross its paddle.
+
+    The intercept is worked out once, after reaction_ticks, whenever the ball's
+    velocity changes (other than a wall bounce, which the prediction already
+    covers) and is off by up to error pixels; in between the AI only moves
+    its paddle towards the cached target.
+    """
+
+    __slots__ = ('reaction_ticks', 'error')
+
+    def __init__(self, reaction_ticks=0, error=0):
+        self.reaction_ticks = reaction_ticks
+        self.error = error
+
+    @classmethod
+    def from_difficulty(cls, difficulty):
+        """Return the AI for one of the AI_DIFFICULTIES levels."""
+        if difficulty not in AI_DIFFICULTIES:
+            raise ValueError(f"AI difficulty must be one of {', '.join(AI_DIFFICULTIES)}.")
+        return cls(*AI_DIFFICULTIES[difficulty])
+
+    def __eq__(self, other):
+        return (isinstance(other, PredictiveAI) and
+                (self.reaction_ticks, self.error) == (other.reaction_ticks, other.error))
+
+    def __repr__(self):
+        return f"PredictiveAI(reaction_ticks={self.reaction_ticks}, error={self.error})"
+
+    def move(self, state, ticks=1):
+        """Return the AI paddle's new y after ticks, updating the cached target in state."""
+        velocity = (state.ball_dx, abs(state.ball_dy))
+        if velocity != state.ai_velocity:
+            state.ai_velocity = velocity
+            state.ai_target = None
+            state.ai_wait = self.reaction_ticks
+        if state.ai_target is None:
+            if state.ai_wait >= ticks:
+                state.ai_wait -= ticks
+                return state.ai_y
+            # The reaction delay ends partway through the step: aim, then move for the rest of it
+            ticks -= max(state.ai_wait, 0)
+            state.ai_wait = 0
+            target = predict_intercept(state.ball_x, state.ball_y, state.ball_dx, state.ball_dy,
+                                       AI_X - BALL_RADIUS)
+            if target is None:
+                target = HEIGHT / 2  # Ball heading away: wait in the middle
+            elif self.error:
+                state.rng = next_random(state.rng)
+                target += (state.rng / 0xFFFFFFFF * 2 - 1) * self.error
+            state.ai_target = target
+        gap = state.ai_target - (state.ai_y + PADDLE_HEIGHT / 2)
+        dy = max(-PADDLE_SPEED * ticks, min(PADDLE_SPEED * ticks, gap))
+        return move_paddle(state.ai_y, dy)
+
+def _hit_circle(x, y, dx, dy, cx, cy, radius):
+    """Return (t, nx, ny) for a point moving from (x, y) at (dx, dy) reaching radius of (cx, cy)."""
+    ox, oy = x - cx, y - cy
+    a = dx * dx + dy * dy
+    b = 2 * (ox * dx + oy * dy)
+    c = ox * ox + oy * oy - radius * radius
+    if a == 0 or c < 0 or b >= 0:
+        return None  # Not moving, already overlapping, or moving away
+    disc = b * b - 4 * a * c
+    if disc < 0:
+        return None
+    t = (-b - math.sqrt(disc)) / (2 * a)
+    return t, (ox + dx * t) / radius, (oy + dy * t) / radius
+
+def sweep_rect(x, y, dx, dy, max_t, left, top, right, bottom, radius):
+    """Return the first contact of a moving circle with a rectangle as (t, nx, ny), or None.
+
+    The circle's centre moves from (x, y) by (dx, dy) per unit of t, for t up
+    to max_t; (nx, ny) is the contact normal pointing out of the rectangle.
+    Only contacts with the circle moving into the rectangle count, so a ball
+    that has just bounced cannot collide again on its way out.
+    """
+    # Cheap rejection when the swept box misses the grown rectangle
+    end_x, end_y = x + dx * max_t, y + dy * max_t
+    if (max(x, end_x) < left - radius or min(x, end_x) > right + radius or
+            max(y, end_y) < top - radius or min(y, end_y) > bottom + radius):
+        return None
+    hits = []
+    # Flat sides: the rectangle grown by the radius
+    if dx > 0 and x <= left - radius:
+        t = (left - radius - x) / dx
+        if top <= y + dy * t <= bottom:
+            hits.append((t, -1.0, 0.0))
+    if dx < 0 and x >= right + radius:
+        t = (right + radius - x) / dx
+        if top <= y + dy * t <= bottom:
+            hits.append((t, 1.0, 0.0))
+    if dy > 0 and y <= top - radius:
+        t = (top - radius - y) / dy
+        if left <= x + dx * t <= right:
+            hits.append((t, 0.0, -1.0))
+    if dy < 0 and y >= bottom + radius:
+        t = (bottom + radius - y) / dy
+        if left <= x + dx * t <= right:
+            hits.append((t, 0.0, 1.0))
+    # Rounded corners
+    for cx, cy in ((left, top), (right, top), (left, bottom), (right, bottom)):
+        hit = _hit_circle(x, y, dx, dy, cx, cy, radius)
+        if hit is not None:
+            hits.append(hit)
+    hit = min(hits) if hits else None
+    return hit if hit is not None and hit[0] <= max_t else None
+
+def sweep_ball(state, ticks):
+    """Move the ball ticks along its velocity, resolving every bounce on the way.
+
+    Walls and paddles are found by their exact time of impact within the step,
+    so fast balls and large steps neither tunnel through paddles nor stick in
+    walls. Returns "AI" or "Player" if that side scored, else None.
+    """
+    remaining = ticks
+    for _ in range(MAX_BOUNCES):
+        if remaining <= 0:
+            break
+        x, y, dx, dy = state.ball_x, state.ball_y, state.ball_dx, state.ball_dy
+        # The earliest event this step: time, normal, paddle hit (if any) and scorer (if any)
+        first, normal, paddle_y, scorer = remaining, None, None, None
+        # Walls and goal lines, only when moving towards them
+        if dy < 0:
+            t = max((BALL_RADIUS - y) / dy, 0)
+            if t < first:
+                first, normal = t, (0.0, 1.0)
+        elif dy > 0:
+            t = max((HEIGHT - BALL_RADIUS - y) / dy, 0)
+            if t < first:
+                first, normal = t, (0.0, -1.0)
+        if dx < 0:
+            t = max((BALL_RADIUS - x) / dx, 0)
+            if t <= first:
+                first, normal, scorer = t, None, "AI"
+        elif dx > 0:
+            t = max((WIDTH - BALL_RADIUS - x) / dx, 0)
+            if t <= first:
+                first, normal, scorer = t, None, "Player"
+        for px, py in ((PLAYER_X, state.player_y), (AI_X, state.ai_y)):
+            hit = sweep_rect(x, y, dx, dy, first, px, py, px + PADDLE_WIDTH, py + PADDLE_HEIGHT,
+                             BALL_RADIUS)
+            if hit is not None:
+                first, normal, paddle_y, scorer = hit[0], hit[1:], py, None
+
+        state.ball_x = x + dx * first
+        state.ball_y = y + dy * first
+        remaining -= first
+        if scorer is not None:
+            return scorer
+        if normal is None:
+            break
+        # Reflect the velocity about the contact normal
+        nx, ny = normal
+        dot = dx * nx + dy * ny
+        state.ball_dx = dx - 2 * dot * nx
+        state.ball_dy = dy - 2 * dot * ny
+        if paddle_y is not None:
+            # Paddle hit: add spin from the impact point
+            state.ball_dy = apply_spin(state.ball_y, state.ball_dy, paddle_y)
+    return None
+
+def ramp_time_scale(scale, target, ticks):
+    """Ramp scale towards target over ticks at TIME_SCALE_RAMP per tick.
+
+    Returns (new scale, ball ticks), the second being how far the ball
+    travels, in full-speed ticks, while the scale changes.
+    """
+    reach = abs(target - scale) / TIME_SCALE_RAMP
+    if reach >= ticks:
+        new_scale = scale + math.copysign(TIME_SCALE_RAMP * ticks, target - scale)
+        return new_scale, ticks * (scale + new_scale) / 2
+    return target, reach * (scale + target) / 2 + (ticks - reach) * target
+
+class FixedStepScheduler:
+    """Turns real elapsed time into a whole number of fixed simulation ticks.
+
+    Real time accumulates across frames and is spent DT at a time, so the game
+    plays the same at any frame rate: a slow or late frame just runs more
+    ticks. At most max_ticks run per frame and any backlog beyond that is
+    dropped, so a long stall does not snowball.
+    """
+
+    def __init__(self, tick_rate=TICK_RATE, max_ticks=8):
+        self.dt = 1 / tick_rate
+        self.max_ticks = max_ticks
+        self.accumulator = 0.0
+
+    def ticks(self, elapsed):
+        """Add elapsed seconds of real time and return how many ticks to run now."""
+        self.accumulator += elapsed
+        ticks = int(self.accumulator / self.dt)
+        if ticks > self.max_ticks:
+            self.accumulator = 0.0
+            return self.max_ticks
+        self.accumulator -= ticks * self.dt
+        return ticks
+
+def advance(state, move, ticks=1):
+    """Advance state in place by ticks (1 is one 1/60 s frame), with the player moving UP, STAY or DOWN.
+
+    A step of several ticks is run one tick at a time (plus any fraction
+    left over), so it ends exactly where that many single ticks would: the
+    paddles move between ticks and the chasing AI reacts to the ball every
+    tick, which one long sweep against end-of-step paddles cannot
+    reproduce. Within each tick the ball is swept, so it cannot tunnel
+    however fast it goes.
+    """
+    whole, part = divmod(ticks, 1)
+    for _ in range(int(whole)):
+        if state.winner is not None:
+            return state
+        _advance_tick(state, move, 1)
+    if part and state.winner is None:
+        _advance_tick(state, move, part)
+    return state
+
+def _advance_tick(state, move, ticks):
+    """Advance state in place by at most one tick."""
+    state.tick += ticks
+    state.player_y = move_paddle(state.player_y, move * PADDLE_SPEED * ticks)
+
+    # SuperHot: the ball speeds up while the player moves and slows to a stop when they don't
+    state.time_scale, ball_ticks = ramp_time_scale(state.time_scale, 1.0 if move else 0.0, ticks)
+    scorer = sweep_ball(state, ball_ticks) if ball_ticks > 0 else None
+
+    if state.ai is None:
+        state.ai_y = ai_move(state.ai_y, state.ball_y, ticks)
+    else:
+        state.ai_y = state.ai.move(state, ticks)
+
+    # Scoring
+    if scorer == "AI":
+        state.ai_score += 1
+        serve(state)
+    elif scorer == "Player":
+        state.player_score += 1
+        serve(state)
+
+    if state.player_score == WIN_SCORE:
+        state.winner = "Player"
+    elif state.ai_score == WIN_SCORE:
+        state.winner = "AI"
+
+def step(state, move, ticks=1):
+    """Return the state ticks after state, leaving state itself untouched."""
+    return advance(state.copy(), move, ticks)
+
+def run_match(policy, seed=None, max_ticks=None, ai=None):
+    """Play a match headlessly, with policy(state) choosing each tick's move.
+
+    Returns the final state, which has a winner unless max_ticks ran out first.
+    """
+    state = new_state(seed, ai)
+    while state.winner is None and (max_ticks is None or state.tick < max_ticks):
+        advance(state, policy(state))
+    return state
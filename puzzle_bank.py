@@ -0,0 +1,129 @@
+import argparse
+import mmap
+import random
+import struct
+
+import numpy as np
+
+from sudoku import DIFFICULTY_REMOVALS, N, generate_sudoku, solve_sudoku
+
+# File layout: header, one index entry per difficulty, then fixed-size records.
+# Each record is a puzzle followed by its solution, packed two cells per byte.
+MAGIC = b"SDKB"
+VERSION = 1
+HEADER = struct.Struct("<4sHH")        # magic, version, number of difficulties
+INDEX_ENTRY = struct.Struct("<8sII")   # difficulty name, first record, record count
+BOARD_BYTES = (N * N + 1) // 2
+RECORD_SIZE = 2 * BOARD_BYTES
+
+DEFAULT_BANK_PATH = "puzzles.bank"
+
+def pack_board(board):
+    """Pack a 9x9 board into BOARD_BYTES bytes, 4 bits per cell."""
+    cells = np.zeros(2 * BOARD_BYTES, dtype=np.uint8)
+    cells[:N * N] = np.asarray(board).ravel()
+    return ((cells[0::2] << 4) | cells[1::2]).tobytes()
+
+def unpack_board(data):
+    """Unpack BOARD_BYTES bytes produced by pack_board into a 9x9 board."""
+    packed = np.frombuffer(data, dtype=np.uint8)
+    cells = np.empty(2 * BOARD_BYTES, dtype=int)
+    cells[0::2] = packed >> 4
+    cells[1::2] = packed & 0x0F
+    return cells[:N * N].reshape(N, N)
+
+def build_bank(path, counts, unique=True):
+    """Generate puzzles and write them with their solutions to a bank file.
+
+    counts maps each difficulty name to the number of puzzles to generate.
+    """
+    with open(path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, VERSION, len(counts)))
+        first = 0
+        for difficulty, count in counts.items():
+            f.write(INDEX_ENTRY.pack(difficulty.encode("ascii"), first, count))
+            first += count
+        for difficulty, count in counts.items():
+            for _ in range(count):
+                puzzle = generate_sudoku(difficulty, unique=unique)
+                solution = puzzle.copy()
+                solve_sudoku(solution)
+                f.write(pack_board(puzzle))
+                f.write(pack_board(solution))
+
+class PuzzleBank:
+    """Memory-mapped, read-only view of a puzzle bank file.
+
+    Only the header is parsed up front; each lookup reads a single record
+    straight out of the mapping.
+    """
+
+    def __init__(self, path):
+        self.file = open(path, "rb")
+        self.data = None
+        try:
+            self.data = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+            magic, version, levels = HEADER.unpack_from(self.data, 0)
+            if magic != MAGIC or version != VERSION:
+                raise ValueError(f"not a version {VERSION} puzzle bank")
+            self.index = {}
+            for k in range(levels):
+                name, first, count = INDEX_ENTRY.unpack_from(self.data, HEADER.size + k * INDEX_ENTRY.size)
+                self.index[name.rstrip(b"\0").decode("ascii")] = (first, count)
+            self.records_start = HEADER.size + levels * INDEX_ENTRY.size
+            if self.records_start + len(self) * RECORD_SIZE > len(self.data):
+                raise ValueError("truncated puzzle bank")
+        except (OSError, ValueError, struct.error, UnicodeDecodeError) as error:
+            # Empty files cannot be mapped and short ones fail to unpack
+            self.close()
+            raise ValueError(f"{path}: {error}") from error
+
+    def __len__(self):
+        return sum(count for _, count in self.index.values())
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        """Release the mapping and the underlying file."""
+        if self.data is not None:
+            self.data.close()
+        self.file.close()
+
+    def count(self, difficulty):
+        """Return how many puzzles of the given difficulty the bank holds."""
+        return self.index.get(difficulty, (0, 0))[1]
+
+    def get(self, difficulty, k):
+        """Return (puzzle, solution) for the k-th puzzle of the given difficulty."""
+        first, count = self.index[difficulty]
+        if not 0 <= k < count:
+            raise IndexError(f"no puzzle {k} for difficulty {difficulty!r}")
+        offset = self.records_start + (first + k) * RECORD_SIZE
+        puzzle = unpack_board(self.data[offset:offset + BOARD_BYTES])
+        solution = unpack_board(self.data[offset + BOARD_BYTES:offset + RECORD_SIZE])
+        return puzzle, solution
+
+    def random_puzzle(self, difficulty='easy'):
+        """Return a random (puzzle, solution) pair of the given difficulty."""
+        if not self.count(difficulty):
+            raise ValueError(f"The puzzle bank has no {difficulty!r} puzzles.")
+        return self.get(difficulty, random.randrange(self.count(difficulty)))
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build a pre-generated Sudoku puzzle bank.")
+    parser.add_argument("path", nargs="?", default=DEFAULT_BANK_PATH)
+    for difficulty in DIFFICULTY_REMOVALS:
+        parser.add_argument(f"--{difficulty}", type=int, default=1000,
+                            help=f"number of {difficulty} puzzles (default 1000)")
+    parser.add_argument("--seed", type=int, help="seed for reproducible banks")
+    args = parser.parse_args()
+
+    if args.seed is not None:
+        random.seed(args.seed)
+    counts = {difficulty: getattr(args, difficulty) for difficulty in DIFFICULTY_REMOVALS}
+    build_bank(args.path, counts)
+    print(f"Wrote {sum(counts.values())} puzzles to {args.path}")
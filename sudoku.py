@@ -1,21 +1,37 @@
+import argparse
+import math
 import numpy as np
+import os
 import random
+import sys
 import time
+from collections import Counter
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from operator import itemgetter
 
-# Sudoku board size
+# Sudoku board size; boards of other sizes are N*N with N a square (16x16, 25x25, ...)
 N = 9
 
-
+def box_size(board):
+    """Return the box size of a square (or flattened) board: 3 for 9x9, 4 for 16x16, 5 for 25x25."""
+    cells = np.size(board)
+    box = math.isqrt(math.isqrt(cells))
+    if box ** 4 != cells:
+        raise ValueError(f"A board of {cells} cells is not made of square boxes.")
+    return box
 
 def print_board(board):
     """Print the Sudoku board in a readable format."""
-    for i in range(N):
-        if i % 3 == 0 and i != 0:
-            print("-" * 21)
-        for j in range(N):
-            if j % 3 == 0 and j != 0:
+    box = box_size(board)
+    side = box * box
+    width = len(str(side))
+    for i in range(side):
+        if i % box == 0 and i != 0:
+            print("-" * ((width + 1) * side + 2 * (box - 1) - 1))
+        for j in range(side):
+            if j % box == 0 and j != 0:
                 print("| ", end="")
-            print(board[i, j] if board[i, j] != 0 else "_", end=" ")
+            print(str(board[i, j] if board[i, j] != 0 else "_").rjust(width), end=" ")
         print()
 
 def is_valid(board, row, col, num):
@@ -24,73 +40,892 @@ def is_valid(board, row, col, num):
         return False
     if num in board[:, col]:
         return False
-    start_row, start_col = 3 * (row // 3), 3 * (col // 3)
-    if num in board[start_row:start_row + 3, start_col:start_col + 3]:
+    box = box_size(board)
+    start_row, start_col = box * (row // box), box * (col // box)
+    if num in board[start_row:start_row + box, start_col:start_col + box]:
         return False
     return True
 
 def find_empty_location(board):
     """Find an empty location on the board."""
-    for row in range(N):
-        for col in range(N):
+    for row in range(len(board)):
+        for col in range(len(board)):
             if board[row, col] == 0:
                 return row, col
     return None
 
-def solve_sudoku(board):
-    """Solve the Sudoku board using backtracking."""
+def solve_sudoku_backtracking(board):
+    """Solve the Sudoku board using plain cell-by-cell backtracking."""
     empty = find_empty_location(board)
     if not empty:
         return True  # Puzzle solved
     row, col = empty
-    for num in range(1, N + 1):
+    for num in range(1, len(board) + 1):
         if is_valid(board, row, col, num):
             board[row, col] = num
-            if solve_sudoku(board):
+            if solve_sudoku_backtracking(board):
                 return True
             board[row, col] = 0  # Undo placement
     return False
 
+class Geometry:
+    """Cell and unit lookup tables for boards of box x box boxes.
+
+    Candidate bitmasks use bit d for digit d, so all_digits has bits 1..side
+    set; Python ints are wide enough for any board size.
+    """
+
+    def __init__(self, box):
+        side = box * box
+        self.box = box
+        self.side = side
+        self.num_cells = side * side
+        self.all_digits = sum(1 << d for d in range(1, side + 1))
+        self.cell_row = [i // side for i in range(side * side)]
+        self.cell_col = [i % side for i in range(side * side)]
+        self.cell_box = [box * (i // (box * side)) + (i % side) // box for i in range(side * side)]
+        self.cell_units = list(zip(self.cell_row, self.cell_col, self.cell_box))
+        self.units = ([[r * side + c for c in range(side)] for r in range(side)] +
+                      [[r * side + c for r in range(side)] for c in range(side)] +
+                      [[(box * (b // box) + i) * side + box * (b % box) + j
+                        for i in range(box) for j in range(box)] for b in range(side)])
+        self.unit_getters = [itemgetter(*unit) for unit in self.units]
+        if side <= 16:
+            self.popcount = [bin(m).count("1") for m in range(self.all_digits + 1)].__getitem__
+        else:
+            self.popcount = lambda mask: bin(mask).count("1")
+        # From 16x16 up, hidden singles are found with NumPy over all units at once
+        self.unit_array = np.array(self.units) if side >= 16 else None
+        self.digits = np.arange(1, side + 1)
+
+    def hidden_singles(self, cand, placed):
+        """Return (cell, digit) for every digit with one possible cell in a unit, or None.
+
+        cand holds each cell's candidate bitmask (0 for filled cells) and placed
+        each unit's bitmask of placed digits, in the order of units. None means
+        some digit has nowhere to go in a unit.
+        """
+        unit_cand = np.array(cand, dtype=np.int64)[self.unit_array]
+        bits = (unit_cand[:, :, None] >> self.digits) & 1            # unit, cell, digit
+        counts = bits.sum(1)
+        free = (np.array(placed, dtype=np.int64)[:, None] >> self.digits) & 1 == 0
+        if (free & (counts == 0)).any():
+            return None
+        units, digits = np.nonzero(free & (counts == 1))
+        cells = self.unit_array[units, bits[units, :, digits].argmax(1)]
+        return list(zip(cells.tolist(), (digits + 1).tolist()))
+
+_geometries = {}
+
+def geometry(box=3):
+    """Return the (shared) Geometry for boards of box x box boxes."""
+    if box not in _geometries:
+        _geometries[box] = Geometry(box)
+    return _geometries[box]
+
+# Cell indices of the rows, columns and boxes of the standard 9x9 board
+UNITS = geometry(3).units
+
+class SolverStats:
+    """Counters and an optional per-event callback for instrumenting BitmaskSolver.
+
+    hook, if given, is called as hook(event, depth, cell, num) for every
+    search event: 'node', 'guess', 'backtrack', 'contradiction' and 'solution'.
+    Cell and digit are None for events that do not concern a placement.
+    """
+
+    def __init__(self, hook=None):
+        self.hook = hook
+        self.nodes = 0
+        self.guesses = 0
+        self.backtracks = 0
+        self.contradictions = 0
+        self.solutions = 0
+        self.naked_singles = 0
+        self.hidden_singles = 0
+        self.max_depth = 0
+        self.depth_histogram = Counter()
+
+    def record(self, event, depth, cell=None, num=None):
+        """Count one search event and pass it on to the hook."""
+        if event == 'node':
+            self.nodes += 1
+            self.depth_histogram[depth] += 1
+            if depth > self.max_depth:
+                self.max_depth = depth
+        elif event == 'guess':
+            self.guesses += 1
+        elif event == 'backtrack':
+            self.backtracks += 1
+        elif event == 'contradiction':
+            self.contradictions += 1
+        elif event == 'solution':
+            self.solutions += 1
+        if self.hook is not None:
+            self.hook(event, depth, cell, num)
+
+    def as_dict(self):
+        """Return the counters as a plain dict, e.g. for logging or JSON export."""
+        return {
+            'nodes': self.nodes,
+            'guesses': self.guesses,
+            'backtracks': self.backtracks,
+            'contradictions': self.contradictions,
+            'solutions': self.solutions,
+            'naked_singles': self.naked_singles,
+            'hidden_singles': self.hidden_singles,
+            'max_depth': self.max_depth,
+            'depth_histogram': dict(sorted(self.depth_histogram.items())),
+        }
+
+class BitmaskSolver:
+    """Constraint-propagation solver over per-row/column/box digit bitmasks.
+
+    Placements are recorded on a trail so that any amount of work can be
+    undone cheaply, which lets the search branch without copying the board.
+    Pass a SolverStats to collect counters; without one the search only
+    pays for a few None checks.
+    """
+
+    def __init__(self, board, stats=None):
+        self.geometry = geo = geometry(box_size(board))
+        self.side = geo.side
+        self.cell_units = geo.cell_units
+        self.stats = stats
+        self.cells = np.asarray(board).ravel().tolist()
+        self.rows = [0] * geo.side
+        self.cols = [0] * geo.side
+        self.boxes = [0] * geo.side
+        self.trail = []
+        self.nodes = 0
+        self.consistent = True
+        self.node_limit = None   # Set by count_solutions(max_nodes=...)
+        for i, num in enumerate(self.cells):
+            if num:
+                bit = 1 << num
+                r, c, b = geo.cell_units[i]
+                if (self.rows[r] | self.cols[c] | self.boxes[b]) & bit:
+                    self.consistent = False
+                self.rows[r] |= bit
+                self.cols[c] |= bit
+                self.boxes[b] |= bit
+
+    def candidates(self, i):
+        """Return the bitmask of digits that may still go in cell i."""
+        r, c, b = self.cell_units[i]
+        return self.geometry.all_digits & ~(self.rows[r] | self.cols[c] | self.boxes[b])
+
+    def place(self, i, num):
+        """Put num in cell i and record it on the trail."""
+        bit = 1 << num
+        r, c, b = self.cell_units[i]
+        self.cells[i] = num
+        self.rows[r] |= bit
+        self.cols[c] |= bit
+        self.boxes[b] |= bit
+        self.trail.append(i)
+
+    def undo(self, mark):
+        """Take back every placement made since the trail had length mark."""
+        cells, trail, cell_units = self.cells, self.trail, self.cell_units
+        while len(trail) > mark:
+            i = trail.pop()
+            bit = 1 << cells[i]
+            cells[i] = 0
+            r, c, b = cell_units[i]
+            self.rows[r] ^= bit
+            self.cols[c] ^= bit
+            self.boxes[b] ^= bit
+
+    def propagate(self, hidden_singles=True):
+        """Apply naked and (optionally) hidden singles until stuck.
+
+        Returns the candidate bitmask of every cell (0 for filled cells) at the
+        fixed point, or None if the board reached a contradiction.
+        """
+        cells, rows, cols, boxes, trail = self.cells, self.rows, self.cols, self.boxes, self.trail
+        stats, geo, cell_units = self.stats, self.geometry, self.cell_units
+        all_digits = geo.all_digits
+        empties = [i for i in range(geo.num_cells) if cells[i] == 0]
+        while True:
+            # Naked singles: cells with exactly one candidate left
+            start = len(trail)
+            cand = [0] * geo.num_cells
+            remaining = []
+            progress = False
+            for i in empties:
+                if cells[i]:
+                    continue
+                r, c, b = cell_units[i]
+                mask = all_digits & ~(rows[r] | cols[c] | boxes[b])
+                if not mask:
+                    return None
+                if mask & (mask - 1):
+                    cand[i] = mask
+                    remaining.append(i)
+                else:
+                    cells[i] = mask.bit_length() - 1
+                    rows[r] |= mask
+                    cols[c] |= mask
+                    boxes[b] |= mask
+                    trail.append(i)
+                    progress = True
+            empties = remaining
+            if stats is not None:
+                stats.naked_singles += len(trail) - start
+            if progress:
+                continue
+            if not hidden_singles:
+                return cand
+            # Hidden singles: digits with exactly one possible cell in a unit
+            start = len(trail)
+            if geo.unit_array is not None:
+                singles = geo.hidden_singles(cand, rows + cols + boxes)
+                if singles is None:
+                    return None
+                for i, num in singles:
+                    if cells[i] == 0 and self.candidates(i) & (1 << num):
+                        self.place(i, num)
+                        progress = True
+                units = ()  # Already done
+            else:
+                units = zip(geo.units, geo.unit_getters, rows + cols + boxes)
+            for unit, gather, placed in units:
+                once = twice = 0
+                for mask in gather(cand):
+                    twice |= once & mask
+                    once |= mask
+                if once | placed != all_digits:
+                    return None  # Some digit has nowhere to go in this unit
+                hidden = once & ~twice & ~placed
+                while hidden:
+                    bit = hidden & -hidden
+                    hidden ^= bit
+                    for i in unit:
+                        if cand[i] & bit:
+                            # Earlier placements in this pass may have taken the cell or digit
+                            if cells[i] == 0 and self.candidates(i) & bit:
+                                self.place(i, bit.bit_length() - 1)
+                                progress = True
+                            break
+            if stats is not None:
+                stats.hidden_singles += len(trail) - start
+            if not progress:
+                return cand
+
+    def choose_branch(self, cand):
+        """Return the (cell, digit) alternatives to branch on, or None if the board is full.
+
+        Picks the most constrained cell (MRV); when no cell is down to two
+        candidates, a digit with only two possible cells in some unit is used instead.
+        """
+        geo = self.geometry
+        popcount = geo.popcount
+        best, best_cand, best_count = None, 0, geo.side + 1
+        for i in range(geo.num_cells):
+            mask = cand[i]
+            if mask:
+                count = popcount(mask)
+                if count < best_count:
+                    best, best_cand, best_count = i, mask, count
+                    if count == 2:
+                        break
+        if best is None:
+            return None
+        if best_count > 2:
+            for unit in geo.units:
+                once = twice = thrice = 0
+                for i in unit:
+                    mask = cand[i]
+                    thrice |= twice & mask
+                    twice |= once & mask
+                    once |= mask
+                pair = twice & ~thrice
+                if pair:
+                    bit = pair & -pair
+                    num = bit.bit_length() - 1
+                    return [(i, num) for i in unit if cand[i] & bit]
+        options = []
+        while best_cand:
+            bit = best_cand & -best_cand
+            best_cand ^= bit
+            options.append((best, bit.bit_length() - 1))
+        return options
+
+    def solve(self):
+        """Solve from the current state; return True if a solution was found."""
+        return self.consistent and SudokuStepper(self).step() == SudokuStepper.SOLVED
+
+    def count(self, limit, depth=0):
+        """Count solutions below the current state, stopping once limit are found."""
+        if self.node_limit is not None and self.nodes >= self.node_limit:
+            return limit  # Out of budget: report "too many" rather than guess
+        stats = self.stats
+        self.nodes += 1
+        if stats is not None:
+            stats.record('node', depth)
+        mark = len(self.trail)
+        cand = self.propagate()
+        if cand is None:
+            if stats is not None:
+                stats.record('contradiction', depth)
+            self.undo(mark)
+            return 0
+        options = self.choose_branch(cand)
+        if options is None:
+            if stats is not None:
+                stats.record('solution', depth)
+            self.undo(mark)
+            return 1
+        total = 0
+        for i, num in options:
+            if stats is not None:
+                stats.record('guess', depth, i, num)
+            branch = len(self.trail)
+            self.place(i, num)
+            total += self.count(limit - total, depth + 1)
+            self.undo(branch)
+            if stats is not None:
+                stats.record('backtrack', depth, i, num)
+            if total >= limit:
+                break
+        self.undo(mark)
+        return total
+
+    def count_solutions(self, limit=2, max_nodes=None):
+        """Return the number of solutions, capped at limit; the solver state is left unchanged.
+
+        If max_nodes search nodes are not enough to settle the count, limit is
+        returned, so a budgeted uniqueness check errs towards "not unique".
+        """
+        if not self.consistent:
+            return 0
+        self.node_limit = None if max_nodes is None else self.nodes + max_nodes
+        try:
+            return self.count(limit)
+        finally:
+            self.node_limit = None
+
+    def grade(self):
+        """Grade the current state by the techniques needed to solve it.
+
+        'easy' needs naked singles only, 'medium' also needs hidden singles
+        and 'hard' needs guessing. The solver state is left unchanged.
+        """
+        mark = len(self.trail)
+        for difficulty, hidden_singles in (('easy', False), ('medium', True)):
+            cand = self.propagate(hidden_singles)
+            self.undo(mark)
+            if cand is not None and not any(cand):
+                return difficulty
+        return 'hard'
+
+    def remove_given(self, i):
+        """Empty cell i, which must not be on the trail, and return the digit it held."""
+        num = self.cells[i]
+        bit = 1 << num
+        r, c, b = self.cell_units[i]
+        self.cells[i] = 0
+        self.rows[r] ^= bit
+        self.cols[c] ^= bit
+        self.boxes[b] ^= bit
+        return num
+
+    def add_given(self, i, num):
+        """Put num back in cell i as a given, without recording it on the trail."""
+        bit = 1 << num
+        r, c, b = self.cell_units[i]
+        self.cells[i] = num
+        self.rows[r] |= bit
+        self.cols[c] |= bit
+        self.boxes[b] |= bit
+
+class SudokuStepper:
+    """Resumable search over a BitmaskSolver, driven by an explicit stack.
+
+    Each call to step() runs until the board is solved, proved unsolvable,
+    or the node or wall-clock budget runs out, and can be called again to
+    carry on. Between calls solver.cells holds the partial board, so a long
+    solve can be run in slices (e.g. from a Tk after loop) or cancelled.
+    """
+
+    RUNNING = 'running'
+    SOLVED = 'solved'
+    UNSOLVABLE = 'unsolvable'
+    CANCELLED = 'cancelled'
+
+    def __init__(self, solver):
+        self.solver = solver
+        self.status = self.RUNNING if solver.consistent else self.UNSOLVABLE
+        # One frame per open guess: [trail mark, mark before guess, options, next option]
+        self.stack = []
+        self.expand = True
+
+    def step(self, max_nodes=None, time_budget=None):
+        """Advance the search and return the status.
+
+        max_nodes caps the search nodes expanded by this call and
+        time_budget caps its wall-clock seconds; the status is still
+        RUNNING if either runs out first.
+        """
+        if self.status != self.RUNNING:
+            return self.status
+        solver, stack, stats = self.solver, self.stack, self.solver.stats
+        deadline = None if time_budget is None else time.perf_counter() + time_budget
+        nodes = 0
+        while True:
+            if self.expand:
+                # Budgets are checked between nodes, where the state is consistent
+                if max_nodes is not None and nodes >= max_nodes:
+                    return self.status
+                if deadline is not None and time.perf_counter() >= deadline:
+                    return self.status
+                nodes += 1
+                solver.nodes += 1
+                depth = len(stack)
+                if stats is not None:
+                    stats.record('node', depth)
+                mark = len(solver.trail)
+                cand = solver.propagate()
+                self.expand = False
+                if cand is None:
+                    if stats is not None:
+                        stats.record('contradiction', depth)
+                    solver.undo(mark)
+                    continue
+                options = solver.choose_branch(cand)
+                if options is None:
+                    if stats is not None:
+                        stats.record('solution', depth)
+                    self.status = self.SOLVED
+                    return self.status
+                stack.append([mark, len(solver.trail), options, 0])
+                continue
+
+            # Try the next alternative of the innermost open guess
+            if not stack:
+                self.status = self.UNSOLVABLE
+                return self.status
+            frame = stack[-1]
+            mark, branch, options, k = frame
+            if k:
+                solver.undo(branch)
+                if stats is not None:
+                    stats.record('backtrack', len(stack) - 1, *options[k - 1])
+            if k < len(options):
+                frame[3] = k + 1
+                if stats is not None:
+                    stats.record('guess', len(stack) - 1, *options[k])
+                solver.place(*options[k])
+                self.expand = True
+            else:
+                solver.undo(mark)
+                stack.pop()
+
+    def cancel(self):
+        """Stop the search for good, keeping the partial board reached so far."""
+        if self.status == self.RUNNING:
+            self.status = self.CANCELLED
+
+    def board(self):
+        """Return the current (possibly partial) board as a square array."""
+        side = self.solver.side
+        return np.array(self.solver.cells).reshape(side, side)
+
+def solve_sudoku(board, stats=None):
+    """Solve the Sudoku board in place using the bitmask constraint-propagation solver.
+
+    Pass a SolverStats to collect search counters and trace events.
+    """
+    solver = BitmaskSolver(board, stats)
+    if not solver.solve():
+        return False
+    board[:, :] = np.array(solver.cells).reshape(board.shape)
+    return True
+
+class ConflictIndex:
+    """Per-unit digit counts for a board that is being edited one cell at a time.
+
+    Every edit updates three units in O(1), after which validity, completeness
+    and hint queries are answered without rescanning the board. If the solution
+    is known, cells holding a wrong digit are tracked too, for hints.
+    """
+
+    def __init__(self, board, solution=None):
+        self.geometry = geo = geometry(box_size(board))
+        self.side = side = geo.side
+        self.values = [0] * geo.num_cells
+        self.counts = [[0] * (side + 1) for _ in range(3 * side)]
+        self.duplicates = set()  # (unit, digit) pairs that occur more than once
+        self.empty = set(range(geo.num_cells))
+        self.solution = None if solution is None else np.asarray(solution).ravel().tolist()
+        self.wrong = set()
+        for i, num in enumerate(np.asarray(board).ravel().tolist()):
+            if num:
+                self.set(i // side, i % side, num)
+
+    def _units(self, i):
+        """Return the indices of cell i's row, column and box in self.counts."""
+        r, c, b = self.geometry.cell_units[i]
+        return r, self.side + c, 2 * self.side + b
+
+    def set(self, row, col, num):
+        """Record num (0 to clear) in board[row][col]."""
+        i = row * self.side + col
+        old = self.values[i]
+        if old == num:
+            return
+        for unit in self._units(i):
+            counts = self.counts[unit]
+            if old:
+                counts[old] -= 1
+                if counts[old] == 1:
+                    self.duplicates.discard((unit, old))
+            if num:
+                counts[num] += 1
+                if counts[num] == 2:
+                    self.duplicates.add((unit, num))
+        self.values[i] = num
+        if num:
+            self.empty.discard(i)
+        else:
+            self.empty.add(i)
+        if self.solution is not None:
+            if num and num != self.solution[i]:
+                self.wrong.add(i)
+            else:
+                self.wrong.discard(i)
+
+    def is_valid(self, row, col, num):
+        """Check if placing num in board[row][col] clashes with no other cell."""
+        i = row * self.side + col
+        own = 1 if self.values[i] == num else 0
+        return all(self.counts[unit][num] - own == 0 for unit in self._units(i))
+
+    def has_conflicts(self):
+        """Return True if any digit appears twice in a row, column or box."""
+        return bool(self.duplicates)
+
+    def conflicting_cells(self):
+        """Return the set of (row, col) cells involved in any conflict."""
+        cells = set()
+        for unit, num in self.duplicates:
+            for i in self.geometry.units[unit]:
+                if self.values[i] == num:
+                    cells.add(divmod(i, self.side))
+        return cells
+
+    def is_complete(self):
+        """Return True if every cell is filled and nothing conflicts."""
+        return not self.empty and not self.duplicates
+
+    def hint(self):
+        """Return (row, col, num) fixing a wrong cell or filling an empty one, or None.
+
+        Needs the solution to have been given.
+        """
+        if self.solution is None:
+            return None
+        cells = self.wrong or self.empty
+        if not cells:
+            return None
+        i = next(iter(cells))
+        return i // self.side, i % self.side, self.solution[i]
+
+def _solve_chunk(chunk, solver=None):
+    """Solve a stacked (M, side, side) chunk of boards with the named backend; run inside worker processes.
+
+    Boards without a solution come back unchanged. Backends with a
+    chunk-level entry point in CHUNK_SOLVERS get the whole chunk at once.
+    """
+    solve = get_solver(solver)
+    solve_chunk = CHUNK_SOLVERS.get(DEFAULT_SOLVER if solver is None else solver)
+    if solve_chunk is not None:
+        solutions, solved = solve_chunk(chunk)
+        return np.asarray(solutions, dtype=np.int8), np.asarray(solved, dtype=bool)
+    solutions = np.array(chunk, dtype=np.int8)
+    solved = np.zeros(len(solutions), dtype=bool)
+    for k in range(len(solutions)):
+        solved[k] = solve(solutions[k])
+    solutions[~solved] = chunk[~solved]
+    return solutions, solved
+
+def _chunks(boards, chunk_size):
+    """Yield (start index, stacked chunk) pairs from an iterable of square or flattened boards."""
+    chunk, start = [], 0
+    for board in boards:
+        side = box_size(board) ** 2
+        chunk.append(np.asarray(board, dtype=np.int8).reshape(side, side))
+        if len(chunk) == chunk_size:
+            yield start, np.stack(chunk)
+            start += len(chunk)
+            chunk = []
+    if chunk:
+        yield start, np.stack(chunk)
+
+def _pool_map(func, items, workers=None, max_pending=None, ordered=False):
+    """Run func(*args) for each (tag, args) in items across a process pool, yielding (tag, result).
+
+    Items are read lazily and at most max_pending (default 2 per worker) are
+    in flight, so a slow consumer holds back the reader and memory stays
+    flat however many items are fed in. Results arrive in completion order,
+    or in input order if ordered. workers=1 runs everything in this process.
+    """
+    if workers == 1:
+        for tag, args in items:
+            yield tag, func(*args)
+        return
+    if max_pending is None:
+        max_pending = 2 * (workers or os.cpu_count() or 1)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = {}   # future -> tag, in submission order
+        items = iter(items)
+        exhausted = False
+        while True:
+            while not exhausted and len(pending) < max_pending:
+                item = next(items, None)
+                if item is None:
+                    exhausted = True
+                else:
+                    tag, args = item
+                    pending[pool.submit(func, *args)] = tag
+            if not pending:
+                return
+            if ordered:
+                done = [next(iter(pending))]
+            else:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                tag = pending.pop(future)
+                yield tag, future.result()
+
+def iter_solve_many(boards, workers=None, chunk_size=256, max_pending=None):
+    """Solve boards across a process pool, yielding (index, solution, solved) as chunks finish.
+
+    Boards are read lazily and at most max_pending chunks (default 2 per
+    worker) are in flight, so memory stays flat however many boards are fed in.
+    Results arrive in completion order, not input order.
+    """
+    chunks = ((start, (chunk,)) for start, chunk in _chunks(boards, chunk_size))
+    for start, (solutions, solved) in _pool_map(_solve_chunk, chunks, workers, max_pending):
+        for k in range(len(solutions)):
+            yield start + k, solutions[k], bool(solved[k])
+
+def solve_many(boards, workers=None, chunk_size=256):
+    """Solve an (M, side, side) or flattened (M, side * side) array or iterable of boards using a process pool.
+
+    Returns (solutions, solved): an (M, side, side) array holding each solved board
+    (or the unchanged puzzle if it has no solution) and a boolean status per board.
+    """
+    boards = np.asarray(boards if isinstance(boards, np.ndarray) else list(boards))
+    side = box_size(boards[0]) ** 2 if len(boards) else N
+    boards = boards.reshape(-1, side, side)
+    solutions = boards.astype(int)
+    solved = np.zeros(len(boards), dtype=bool)
+    for index, solution, ok in iter_solve_many(boards, workers, chunk_size):
+        solutions[index] = solution
+        solved[index] = ok
+    return solutions, solved
+
+def _solve_batched(board):
+    """Solve one board with the array-wide propagation of sudoku_batch."""
+    from sudoku_batch import solve_batch  # sudoku_batch imports this module
+    solutions, solved = solve_batch(board[None])
+    board[:, :] = solutions[0]
+    return bool(solved[0])
+
+_solution_cache = None
+
+def _solve_batched_chunk(chunk):
+    """Solve a whole chunk in lockstep with sudoku_batch, rather than one board at a time."""
+    from sudoku_batch import solve_batch  # sudoku_batch imports this module
+    return solve_batch(chunk)
+
+def _solve_cached(board):
+    """Solve one board through a shared sudoku_cache.SolutionCache in front of the default solver."""
+    global _solution_cache
+    if _solution_cache is None:
+        from sudoku_cache import SolutionCache  # sudoku_cache imports this module
+        _solution_cache = SolutionCache()
+    return _solution_cache.solve(board)
+
+def _solve_dlx(board):
+    """Solve one board with sudoku_dlx's dancing-links exact-cover search."""
+    from sudoku_dlx import solve_dlx  # sudoku_dlx imports this module
+    return solve_dlx(board)
+
+# Solver backends by name; each solves a board in place and returns True on success.
+# 'batched' and 'cached' handle 9x9 boards only and raise ValueError for others.
+SOLVERS = {
+    'basic': solve_sudoku_backtracking,
+    'optimized': solve_sudoku,
+    'batched': _solve_batched,
+    'cached': _solve_cached,
+    'dlx': _solve_dlx,
+}
+DEFAULT_SOLVER = 'optimized'
+
+# Backends that solve a stacked chunk of boards better than one board at a time;
+# each returns (solutions, solved) like solve_many
+CHUNK_SOLVERS = {
+    'batched': _solve_batched_chunk,
+}
+
+def register_solver(name, solve, solve_chunk=None):
+    """Make solve(board) available to every front end under name.
+
+    solve_chunk(boards), if given, is used instead of solve for stacks of
+    boards, such as the chunks handed to worker processes.
+    """
+    SOLVERS[name] = solve
+    if solve_chunk is not None:
+        CHUNK_SOLVERS[name] = solve_chunk
+    else:
+        CHUNK_SOLVERS.pop(name, None)
+
+def get_solver(name=None):
+    """Return the solver registered under name, or the default one for None."""
+    name = DEFAULT_SOLVER if name is None else name
+    if name not in SOLVERS:
+        raise ValueError(f"Solver must be one of {', '.join(SOLVERS)}.")
+    return SOLVERS[name]
+
+# Complete grids that random_grid transforms into new ones
+SEED_GRIDS = np.array([[int(ch) for ch in grid] for grid in (
+    "376182495498357216125649387781935642634721859259468173963514728542873961817296534",
+    "813467259549812637726359481487136592231975846965248173158723964394681725672594318",
+    "841257936267439518953618247314972685526384791789561324692145873175823469438796152",
+    "381257694472396158965184327637928415154673982298541763723869541819435276546712839",
+)]).reshape(-1, N, N)
+
+def seed_grids(box=3):
+    """Return the complete grids random_grid starts from for boards of box x box boxes."""
+    if box == 3:
+        return SEED_GRIDS
+    # The shifted-rows pattern: row r is 1..side rotated by box * (r % box) + r // box
+    side = box * box
+    r, c = np.indices((side, side))
+    return ((box * (r % box) + r // box + c) % side + 1)[None]
+
+def _band_permutation(box=3):
+    """Return a random order of the rows (or columns) that keeps each band of box rows together."""
+    return [box * band + line for band in random.sample(range(box), box)
+            for line in random.sample(range(box), box)]
+
+def random_grid(box=3):
+    """Return a random complete grid, with no search.
+
+    A seed grid is transformed in ways that keep every row, column and box
+    valid: the digits are relabelled, rows are shuffled within their bands
+    and the bands among themselves, columns likewise within and among stacks,
+    and the result is transposed half the time.
+    """
+    side = box * box
+    seeds = seed_grids(box)
+    digits = np.array([0] + random.sample(range(1, side + 1), side))
+    grid = seeds[random.randrange(len(seeds))]
+    grid = digits[grid[np.ix_(_band_permutation(box), _band_permutation(box))]]
+    return grid.T.copy() if random.random() < 0.5 else grid
+
+def random_grids(count, seed=None, box=3):
+    """Return count random complete grids as a (count, side, side) array, transformed like random_grid.
+
+    All the grids are made at once with NumPy, which is much faster per grid
+    than calling random_grid in a loop. seed seeds NumPy's generator.
+    """
+    rng = np.random.default_rng(seed)
+    side = box * box
+    def band_permutations():
+        bands = np.argsort(rng.random((count, box)), axis=1)
+        lines = np.argsort(rng.random((count, box, box)), axis=2)
+        return (box * bands[:, :, None] + lines).reshape(count, side)
+    rows, cols = band_permutations(), band_permutations()
+    seeds = seed_grids(box)
+    grids = seeds[rng.integers(len(seeds), size=count)]
+    grids = grids[np.arange(count)[:, None, None], rows[:, :, None], cols[:, None, :]]
+    flip = rng.random(count) < 0.5
+    grids[flip] = grids[flip].transpose(0, 2, 1)
+    digits = np.zeros((count, side + 1), dtype=grids.dtype)
+    digits[:, 1:] = np.argsort(rng.random((count, side)), axis=1) + 1
+    return np.take_along_axis(digits, grids.reshape(count, -1), axis=1).reshape(count, side, side)
+
 def fill_board(board):
     """Fill the Sudoku board with a valid solution."""
-    numbers = list(range(1, 10))
-    def fill_box(row_start, col_start):
-        """Fill a 3x3 box with random valid numbers."""
-        numbers_copy = numbers[:]
-        random.shuffle(numbers_copy)
-        for i in range(3):
-            for j in range(3):
-                num = numbers_copy.pop()
-                while not is_valid(board, row_start + i, col_start + j, num):
-                    if not numbers_copy:
-                        numbers_copy = numbers[:]
-                        random.shuffle(numbers_copy)
-                    num = numbers_copy.pop()
-                board[row_start + i, col_start + j] = num
-
-    # Fill the diagonal 3x3 boxes
-    for i in range(0, N, 3):
-        fill_box(i, i)
-    
-    # Solve the filled board
-    solve_sudoku(board)
+    board[:, :] = random_grid(box_size(board))
 
-def generate_sudoku(difficulty='easy'):
-    """Generate a Sudoku board with the specified difficulty and then remove cells."""
-    board = np.zeros((N, N), dtype=int)
-    fill_board(board)
-    
-    # Difficulty levels
-    if difficulty == 'easy':
-        num_cells_to_remove = random.randint(35, 40)
-    elif difficulty == 'medium':
-        num_cells_to_remove = random.randint(45, 50)
-    elif difficulty == 'hard':
-        num_cells_to_remove = random.randint(55, 60)
-    else:
+def count_solutions(board, limit=2):
+    """Count the solutions of the Sudoku board, stopping early once limit is reached."""
+    return BitmaskSolver(board).count_solutions(limit)
+
+def grade_sudoku(board):
+    """Grade a Sudoku board as 'easy', 'medium' or 'hard' by the techniques needed to solve it."""
+    return BitmaskSolver(board).grade()
+
+# Number of cells removed from the full 9x9 grid for each difficulty level
+DIFFICULTY_REMOVALS = {
+    'easy': (35, 40),
+    'medium': (45, 50),
+    'hard': (55, 60),
+}
+
+# Search nodes a uniqueness check may use while generating before the removal is put back;
+# it only binds on large boards, where proving uniqueness can otherwise take seconds
+UNIQUENESS_NODE_BUDGET = 50
+
+def _removal_count(difficulty, box):
+    """Pick how many cells to remove for difficulty, scaling DIFFICULTY_REMOVALS to the board's size."""
+    if difficulty not in DIFFICULTY_REMOVALS:
         raise ValueError("Difficulty must be 'easy', 'medium', or 'hard'.")
-    
-    cells = [(i, j) for i in range(N) for j in range(N)]
+    scale = box ** 4 / (N * N)
+    low, high = DIFFICULTY_REMOVALS[difficulty]
+    return random.randint(round(low * scale), round(high * scale))
+
+def generate_unique_sudoku(difficulty='easy', max_attempts=20, box=3):
+    """Generate a Sudoku board with exactly one solution whose grade matches difficulty.
+
+    Cells are removed one at a time from a full grid, keeping a single solver
+    whose state is updated in place so each uniqueness check only searches
+    from the current board. Removals that would allow a second solution, or
+    push the grade above difficulty, are put back, and removal carries on
+    past the target count until the grade is reached. If no attempt reaches
+    the requested grade, the last board generated is returned.
+    """
+    levels = list(DIFFICULTY_REMOVALS)
+    side = box * box
+    for _ in range(max_attempts):
+        num_cells_to_remove = _removal_count(difficulty, box)
+        solver = BitmaskSolver(random_grid(box))
+        cells = list(range(side * side))
+        random.shuffle(cells)
+        removed, grade = 0, 'easy'
+        for i in cells:
+            if removed >= num_cells_to_remove and grade == difficulty:
+                break
+            num = solver.remove_given(i)
+            if solver.count_solutions(2, UNIQUENESS_NODE_BUDGET) == 1:
+                new_grade = solver.grade()
+                if levels.index(new_grade) <= levels.index(difficulty):
+                    removed, grade = removed + 1, new_grade
+                    continue
+            solver.add_given(i, num)
+        if grade == difficulty:
+            break
+    return np.array(solver.cells).reshape(side, side)
+
+def generate_sudoku(difficulty='easy', unique=False, box=3):
+    """Generate a Sudoku board with the specified difficulty and then remove cells.
+
+    With unique=True the board is guaranteed a single solution and is graded
+    by solving technique; see generate_unique_sudoku. box gives the board
+    size: 3 for 9x9, 4 for 16x16, 5 for 25x25.
+    """
+    if unique:
+        return generate_unique_sudoku(difficulty, box=box)
+    num_cells_to_remove = _removal_count(difficulty, box)
+    side = box * box
+    board = random_grid(box)
+
+    cells = [(i, j) for i in range(side) for j in range(side)]
     random.shuffle(cells)
     for i in range(num_cells_to_remove):
         row, col = cells[i]
@@ -98,24 +933,167 @@ def generate_sudoku(difficulty='easy'):
         
     return board
 
+# The line format: one 9x9 board per line as 81 characters, row by row,
+# with '.' or '0' for an empty cell
+LINE_CELLS = np.full(256, -1, dtype=np.int8)
+LINE_CELLS[ord('.')] = LINE_CELLS[ord('0')] = 0
+LINE_CELLS[ord('1'):ord('9') + 1] = np.arange(1, 10)
+LINE_CHARS = np.frombuffer(b".123456789", dtype=np.uint8)
+
+def parse_lines(lines):
+    """Parse a list of 81-character lines (bytes) into an (M, 9, 9) int8 array.
+
+    Returns (boards, bad): bad lists the positions in lines that are not
+    puzzles, which are left out of boards.
+    """
+    lines = [line.strip() for line in lines]
+    bad = [k for k, line in enumerate(lines) if len(line) != N * N]
+    good = [line for line in lines if len(line) == N * N]
+    cells = LINE_CELLS[np.frombuffer(b"".join(good), dtype=np.uint8)].reshape(-1, N * N)
+    invalid = (cells < 0).any(1)
+    if invalid.any():
+        good_positions = [k for k, line in enumerate(lines) if len(line) == N * N]
+        bad = sorted(bad + [good_positions[k] for k in np.flatnonzero(invalid)])
+        cells = cells[~invalid]
+    return cells.reshape(-1, N, N), bad
+
+def format_lines(boards):
+    """Return an (M, 9, 9) array of boards as 81-character lines, in one bytes object."""
+    boards = np.asarray(boards).reshape(-1, N * N)
+    out = np.empty((len(boards), N * N + 1), dtype=np.uint8)
+    out[:, :-1] = LINE_CHARS[boards]
+    out[:, -1] = ord("\n")
+    return out.tobytes()
+
+def read_puzzle_chunks(stream, chunk_size=1024):
+    """Yield (boards, bad) for each chunk_size lines of a binary stream of puzzles.
+
+    Blank lines and lines starting with '#' are skipped. bad holds the
+    (line number, line) of each line that is not a puzzle.
+    """
+    line_number = 0
+    while True:
+        lines = stream.readlines(chunk_size * (N * N + 2))
+        if not lines:
+            return
+        numbered = [(line_number + k + 1, line) for k, line in enumerate(lines)
+                    if line.strip() and not line.startswith(b"#")]
+        line_number += len(lines)
+        boards, bad = parse_lines([line for _, line in numbered])
+        yield boards, [(numbered[k][0], numbered[k][1].rstrip()) for k in bad]
+
+def _generate_chunk(count, difficulty, unique, seed):
+    """Generate count 9x9 puzzles as a stacked array; run inside worker processes."""
+    random.seed(seed)
+    return np.stack([generate_sudoku(difficulty, unique) for _ in range(count)]).astype(np.int8)
+
+def stream_solve(streams, out, solver=None, workers=None, chunk_size=1024, errors=sys.stderr):
+    """Solve the puzzles on each binary input stream, writing one solution line per puzzle to out.
+
+    Chunks of lines are parsed with NumPy, solved across a process pool with
+    a bounded number of chunks in flight and written back in input order,
+    one write per chunk. Puzzles with no solution are written unchanged.
+    Lines that are not puzzles are reported to errors and skipped. Returns
+    (puzzles, solved) counts.
+    """
+    def chunks():
+        for name, stream in streams:
+            for boards, bad in read_puzzle_chunks(stream, chunk_size):
+                for line_number, line in bad:
+                    print(f"{name}:{line_number}: not a puzzle: {line[:90]!r}", file=errors)
+                if len(boards):
+                    yield None, (boards, solver)
+
+    total = solved_total = 0
+    for _, (solutions, solved) in _pool_map(_solve_chunk, chunks(), workers, ordered=True):
+        out.write(format_lines(solutions))
+        total += len(solved)
+        solved_total += int(solved.sum())
+    out.flush()
+    return total, solved_total
+
+def stream_generate(count, out, difficulty='easy', unique=False, seed=None, workers=None, chunk_size=64):
+    """Generate count puzzles across a process pool, writing them to out as lines as they are made.
+
+    With a seed the output is the same for any number of workers.
+    """
+    def chunks():
+        for k, start in enumerate(range(0, count, chunk_size)):
+            yield None, (min(chunk_size, count - start), difficulty, unique,
+                         None if seed is None else f"{seed}:{k}")
+
+    for _, boards in _pool_map(_generate_chunk, chunks(), workers, ordered=True):
+        out.write(format_lines(boards))
+    out.flush()
+
+def _open_inputs(paths):
+    """Yield (name, binary stream) for each path, with '-' meaning stdin."""
+    for path in paths:
+        if path == "-":
+            yield "<stdin>", sys.stdin.buffer
+        else:
+            with open(path, "rb") as f:
+                yield path, f
+
 if __name__ == "__main__":
-    # User input for difficulty
-    difficulty = input("Enter difficulty level ('easy', 'medium', 'hard'): ").strip().lower()
+    parser = argparse.ArgumentParser(
+        description="Generate a Sudoku and solve it, or stream puzzles in the 81-character line format.")
+    parser.add_argument("paths", nargs="*", metavar="path",
+                        help="puzzle files to solve, one puzzle per line ('-' for stdin)")
+    parser.add_argument("--solver", choices=list(SOLVERS), default=DEFAULT_SOLVER)
+    parser.add_argument("--generate", type=int, metavar="COUNT", help="write COUNT generated puzzles as lines")
+    parser.add_argument("--difficulty", choices=list(DIFFICULTY_REMOVALS), default="easy",
+                        help="difficulty of generated puzzles")
+    parser.add_argument("--unique", action="store_true", help="generate puzzles with a single solution")
+    parser.add_argument("--seed", type=int, help="seed for reproducible generation")
+    parser.add_argument("--workers", type=int, help="worker processes (default: one per CPU, 1 for none)")
+    parser.add_argument("--chunk-size", type=int, help="lines per chunk handed to a worker")
+    parser.add_argument("--output", "-o", help="write lines to this file instead of stdout")
+    args = parser.parse_args()
+    solve = get_solver(args.solver)
+
+    if args.paths or args.generate is not None:
+        unreadable = [path for path in args.paths
+                      if path != "-" and (os.path.isdir(path) or not os.access(path, os.R_OK))]
+        if unreadable:
+            parser.error(f"cannot read {', '.join(unreadable)}")
+        out = open(args.output, "wb") if args.output else sys.stdout.buffer
+        start_time = time.perf_counter()
+        try:
+            if args.generate is not None:
+                stream_generate(args.generate, out, args.difficulty, args.unique, args.seed,
+                                args.workers, args.chunk_size or 64)
+                summary = f"generated {args.generate} puzzles"
+            else:
+                total, solved = stream_solve(_open_inputs(args.paths), out, args.solver,
+                                             args.workers, args.chunk_size or 1024)
+                summary = f"solved {solved} of {total} puzzles"
+        except BrokenPipeError:
+            # The reader went away (e.g. piped into head): stop quietly, with
+            # stdout pointed at devnull so the flush at exit cannot fail again
+            os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+            raise SystemExit(1)
+        finally:
+            if args.output:
+                out.close()
+        elapsed = time.perf_counter() - start_time
+        print(f"{summary} in {elapsed:.2f} seconds", file=sys.stderr)
+    else:
+        # User input for difficulty
+        difficulty = input("Enter difficulty level ('easy', 'medium', 'hard'): ").strip().lower()
     
-    # Generate and print a Sudoku board
-    sudoku_board = generate_sudoku(difficulty)
-    print("\nGenerated Sudoku Board:")
-    print_board(sudoku_board)
+        # Generate and print a Sudoku board
+        sudoku_board = generate_sudoku(difficulty)
+        print("\nGenerated Sudoku Board:")
+        print_board(sudoku_board)
     
-    # Measure time to solve the Sudoku board
-    start_time = time.time()
-    solved_board = sudoku_board.copy()
-    solve_sudoku(solved_board)
-    end_time = time.time()
+        # Measure time to solve the Sudoku board
+        start_time = time.time()
+        solved_board = sudoku_board.copy()
+        solve(solved_board)
+        end_time = time.time()
     
-    print("\nSolved Sudoku Board:")
-    print_board(solved_board)
+        print("\nSolved Sudoku Board:")
+        print_board(solved_board)
     
-    print(f"\nTime taken to solve: {end_time - start_time:.2f} seconds")
-
-
+        print(f"\nTime taken to solve: {end_time - start_time:.2f} seconds")
@@ -0,0 +1,109 @@
+import numpy as np
+
+from sudoku import N, UNITS, solve_sudoku
+
+# Candidates are packed per cell, bit d-1 standing for digit d, so the
+# (M, 81, 9) candidate tensor is held as an (M, 81) uint16 array.
+ALL_CANDIDATES = (1 << N) - 1
+DIGIT_BITS = np.array([ALL_CANDIDATES] + [1 << d for d in range(N)], dtype=np.uint16)
+POPCOUNT = np.array([bin(m).count("1") for m in range(ALL_CANDIDATES + 1)], dtype=np.uint8)
+UNIT_CELLS = np.array(UNITS)
+# Index of each cell's row, column and box unit within UNIT_CELLS
+CELL_ROW_UNIT = np.arange(N * N) // N
+CELL_COL_UNIT = N + np.arange(N * N) % N
+CELL_BOX_UNIT = 2 * N + (3 * (np.arange(N * N) // (3 * N)) + (np.arange(N * N) % N) // 3)
+
+def candidate_masks(boards):
+    """Return the (M, 81) candidate bitmasks for a stack of boards, before any elimination."""
+    return DIGIT_BITS[np.asarray(boards).reshape(-1, N * N)]
+
+def candidate_tensor(cand):
+    """Expand (M, 81) candidate bitmasks into the equivalent (M, 81, 9) boolean tensor."""
+    return (cand[:, :, None] >> np.arange(N, dtype=np.uint16)) & 1 == 1
+
+def _scatter_units(per_unit, rows):
+    """OR an (M, 27, 9) array of per-unit cell values back onto the (M, 81) cells."""
+    out = np.zeros((rows, N * N), dtype=np.uint16)
+    for first in range(0, 3 * N, N):
+        part = np.zeros_like(out)
+        part[:, UNIT_CELLS[first:first + N].ravel()] = per_unit[:, first:first + N].reshape(rows, -1)
+        out |= part
+    return out
+
+def propagate_batch(cand):
+    """Run elimination plus naked and hidden singles on every board until none changes.
+
+    cand is an (M, 81) array of candidate bitmasks and is updated in place.
+    Only boards that changed on the previous sweep are processed again.
+    Returns a boolean array marking boards that reached a contradiction.
+    """
+    dead = np.zeros(len(cand), dtype=bool)
+    active = np.arange(len(cand))
+    while len(active):
+        c = cand[active]
+        before = c.copy()
+        rows = len(c)
+
+        # Eliminate every fixed digit from its row, column and box peers
+        fixed = POPCOUNT[c] == 1
+        placed = np.where(fixed, c, 0)[:, UNIT_CELLS]
+        used = np.bitwise_or.reduce(placed, axis=2)
+        broken = (POPCOUNT[placed].sum(2) != POPCOUNT[used]).any(1)  # A digit fixed twice in a unit
+        peers = used[:, CELL_ROW_UNIT] | used[:, CELL_COL_UNIT] | used[:, CELL_BOX_UNIT]
+        c = np.where(fixed, c, c & ~peers)
+
+        # Hidden singles: a digit with a single possible cell in a unit goes there
+        units = c[:, UNIT_CELLS]
+        once = np.zeros((rows, 3 * N), dtype=np.uint16)
+        twice = np.zeros_like(once)
+        for k in range(N):
+            twice |= once & units[:, :, k]
+            once |= units[:, :, k]
+        broken |= (once != ALL_CANDIDATES).any(1)  # A digit with nowhere to go
+        forced = _scatter_units(units & (once & ~twice)[:, :, None], rows)
+        broken |= (POPCOUNT[forced] > 1).any(1)    # A cell forced to two digits
+        c = np.where(forced != 0, forced, c)
+        broken |= (c == 0).any(1)
+
+        cand[active] = c
+        dead[active[broken]] = True
+        changed = (c != before).any(1)
+        active = active[changed & ~broken]
+    return dead
+
+def boards_from_candidates(cand):
+    """Return (M, 9, 9) boards holding each cell's digit if it is fixed, else 0."""
+    digits = np.log2(np.maximum(cand, 1)).astype(int) + 1
+    return np.where(POPCOUNT[cand] == 1, digits, 0).reshape(-1, N, N)
+
+def solve_batch(boards):
+    """Solve a stack of boards in lockstep with array-wide propagation.
+
+    Boards that singles alone cannot finish fall back to the per-board
+    solver. Returns (solutions, solved) like sudoku.solve_many.
+    """
+    boards = np.asarray(boards)
+    if boards.shape[-1] not in (N, N * N) or boards.size % (N * N):
+        raise ValueError(f"solve_batch only solves {N}x{N} boards.")
+    boards = boards.reshape(-1, N, N)
+    solved = validate_batch(boards)
+    cand = candidate_masks(boards)
+    solved &= ~propagate_batch(cand)
+    solutions = boards_from_candidates(cand)
+    for k in np.flatnonzero(solved & (solutions == 0).any((1, 2))):
+        solved[k] = solve_sudoku(solutions[k])
+    solutions[~solved] = boards[~solved]
+    return solutions, solved
+
+def validate_batch(boards, complete=False):
+    """Return a boolean array marking boards with no digit repeated in any row, column or box.
+
+    With complete=True a board must also have every cell filled.
+    """
+    boards = np.asarray(boards).reshape(-1, N * N)
+    placed = np.where(boards > 0, DIGIT_BITS[boards], 0)[:, UNIT_CELLS]
+    used = np.bitwise_or.reduce(placed, axis=2)
+    valid = (POPCOUNT[placed].sum(2) == POPCOUNT[used]).all(1)
+    if complete:
+        valid &= (boards > 0).all(1)
+    return valid
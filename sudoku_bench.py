@@ -0,0 +1,199 @@
+import argparse
+import hashlib
+import json
+import platform
+import random
+import sys
+import time
+
+import numpy as np
+
+from sudoku import DIFFICULTY_REMOVALS, N, BitmaskSolver, generate_sudoku
+
+# Puzzles known to be slow for naive or MRV-only backtracking
+PATHOLOGICAL = [
+    # Norvig's "hard1", which has many solutions and defeats plain MRV
+    ".....6....59.....82....8....45........3........6..3.54...325..6..................",
+    # Designed against solvers that try cells in order and digits ascending
+    "..............3.85..1.2.......5.7.....4...1...9.......5......73..2.1........4...9",
+    # "AI Escargot"
+    "1....7.9..3..2...8..96..5....53..9...1..8...26....4...3......1..4......7..7...3..",
+    # "Platinum Blonde"
+    ".......12........3..23..4....18....5.6..7.8.......9.....85.....9...4.5..47...6...",
+    "8..........36......7..9.2...5...7.......457.....1...3...1....68..85...1..9....4..",
+    "4.....8.5.3..........7......2.....6.....8.4......1.......6.3.7.5..2.....1.4......",
+    "52...6.........7.13...........4..8..6......5...........418.........3..2...87.....",
+    "6.....8.3.4.7.................5.4.7.3..2.....1.6.......2.....5.....8.6......1....",
+]
+
+# Larger boards benchmarked, with the grade generated for each; harder grades
+# take tens of seconds per 25x25 board to generate
+LARGE_SIZES = {4: 'medium', 5: 'easy'}
+
+# Run settings that must match for two result files to be compared
+COMPARABLE_META = ("seed", "count", "generate_count", "large_count")
+
+# Metrics compared against a baseline, and whether a higher value is better
+TRACKED_METRICS = {"p50_ms": False, "p90_ms": False, "p99_ms": False, "puzzles_per_sec": True}
+
+def parse_puzzle(line):
+    """Parse an 81-character puzzle line ('.' or '0' for empty cells) into a 9x9 board."""
+    return np.array([0 if ch in ".0" else int(ch) for ch in line.strip()]).reshape(N, N)
+
+def build_corpora(count, seed):
+    """Return {name: [boards]} for each difficulty plus the pathological set."""
+    random.seed(seed)
+    corpora = {difficulty: [generate_sudoku(difficulty, unique=True) for _ in range(count)]
+               for difficulty in DIFFICULTY_REMOVALS}
+    corpora["pathological"] = [parse_puzzle(line) for line in PATHOLOGICAL]
+    return corpora
+
+def fingerprint(boards):
+    """Return a short hash identifying a corpus, so results are only compared like for like."""
+    digest = hashlib.sha1()
+    for board in boards:
+        digest.update(np.asarray(board, dtype=np.int8).tobytes())
+    return digest.hexdigest()[:12]
+
+def summarize(latencies, total_time):
+    """Return latency percentiles in milliseconds and throughput for one run."""
+    ms = np.array(latencies) * 1000
+    return {
+        "count": len(ms),
+        "p50_ms": float(np.percentile(ms, 50)),
+        "p90_ms": float(np.percentile(ms, 90)),
+        "p99_ms": float(np.percentile(ms, 99)),
+        "max_ms": float(ms.max()),
+        "puzzles_per_sec": len(ms) / total_time if total_time else float("inf"),
+    }
+
+def bench_solver(boards):
+    """Solve every board once, returning latency, throughput and node statistics."""
+    latencies, nodes = [], []
+    for board in boards:
+        start = time.perf_counter()
+        solver = BitmaskSolver(board)
+        if not solver.solve():
+            raise RuntimeError("benchmark puzzle has no solution")
+        latencies.append(time.perf_counter() - start)
+        nodes.append(solver.nodes)
+    result = summarize(latencies, sum(latencies))
+    result["nodes_mean"] = float(np.mean(nodes))
+    result["nodes_max"] = int(max(nodes))
+    result["corpus"] = fingerprint(boards)
+    return result
+
+def bench_generator(count, seed):
+    """Time the unique-solution generator for each difficulty."""
+    results = {}
+    for difficulty in DIFFICULTY_REMOVALS:
+        random.seed(seed)
+        boards, latencies = [], []
+        for _ in range(count):
+            start = time.perf_counter()
+            boards.append(generate_sudoku(difficulty, unique=True))
+            latencies.append(time.perf_counter() - start)
+        results[difficulty] = summarize(latencies, sum(latencies))
+        results[difficulty]["corpus"] = fingerprint(boards)
+    return results
+
+def bench_sizes(count, seed):
+    """Time unique generation and solving of 16x16 and 25x25 boards."""
+    results = {}
+    for box, difficulty in LARGE_SIZES.items():
+        random.seed(seed)
+        boards, latencies = [], []
+        for _ in range(count):
+            start = time.perf_counter()
+            boards.append(generate_sudoku(difficulty, unique=True, box=box))
+            latencies.append(time.perf_counter() - start)
+        name = f"{box * box}x{box * box}-{difficulty}"
+        results[name + "-gen"] = summarize(latencies, sum(latencies))
+        results[name + "-gen"]["corpus"] = fingerprint(boards)
+        results[name + "-solve"] = bench_solver(boards)
+    return results
+
+def compare(results, baseline, threshold):
+    """Compare results against baseline, returning (regressions, skipped) as human-readable lines.
+
+    skipped lists every result that could not be compared: run settings
+    that differ, results missing from the baseline, or corpora with
+    different fingerprints (as after any change to the generator).
+    """
+    regressions, skipped = [], []
+    meta, old_meta = results.get("meta", {}), baseline.get("meta", {})
+    differing = [key for key in COMPARABLE_META if meta.get(key) != old_meta.get(key)]
+    if differing:
+        skipped.append("all results: run settings differ ("
+                       + ", ".join(f"{key} {old_meta.get(key)} -> {meta.get(key)}" for key in differing) + ")")
+        return regressions, skipped
+    for section in ("solver", "generator", "large"):
+        for name, current in results.get(section, {}).items():
+            previous = baseline.get(section, {}).get(name)
+            if previous is None:
+                skipped.append(f"{section}/{name}: not in the baseline")
+                continue
+            if previous.get("corpus") != current.get("corpus"):
+                skipped.append(f"{section}/{name}: corpus differs "
+                               f"({previous.get('corpus')} -> {current.get('corpus')})")
+                continue
+            for metric, higher_is_better in TRACKED_METRICS.items():
+                old, new = previous[metric], current[metric]
+                if not old:
+                    continue
+                change = (new - old) / old
+                if (change < -threshold) if higher_is_better else (change > threshold):
+                    regressions.append(f"{section}/{name} {metric}: {old:.3f} -> {new:.3f} ({change:+.0%})")
+    return regressions, skipped
+
+def print_report(results):
+    """Print a table of the benchmark results."""
+    print(f"{'':28}{'p50 ms':>9}{'p90 ms':>9}{'p99 ms':>9}{'max ms':>9}{'per sec':>10}{'nodes':>8}")
+    for section in ("solver", "generator", "large"):
+        for name, r in results.get(section, {}).items():
+            nodes = f"{r['nodes_mean']:8.1f}" if "nodes_mean" in r else ""
+            print(f"{section + '/' + name:28}{r['p50_ms']:9.3f}{r['p90_ms']:9.3f}{r['p99_ms']:9.3f}"
+                  f"{r['max_ms']:9.3f}{r['puzzles_per_sec']:10.1f}{nodes}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the Sudoku solver and generator.")
+    parser.add_argument("--count", type=int, default=200, help="puzzles per difficulty corpus")
+    parser.add_argument("--generate-count", type=int, default=20, help="boards generated per difficulty")
+    parser.add_argument("--large-count", type=int, default=3,
+                        help="16x16 and 25x25 boards generated and solved (0 to skip)")
+    parser.add_argument("--seed", type=int, default=2024)
+    parser.add_argument("--output", default="bench_results.json", help="where to write the JSON results")
+    parser.add_argument("--baseline", help="JSON results file to compare against")
+    parser.add_argument("--threshold", type=float, default=0.2,
+                        help="relative slowdown that counts as a regression (default 0.2)")
+    args = parser.parse_args()
+
+    corpora = build_corpora(args.count, args.seed)
+    results = {
+        "meta": {"seed": args.seed, "count": args.count, "generate_count": args.generate_count,
+                 "large_count": args.large_count, "python": platform.python_version(),
+                 "machine": platform.machine(), "time": time.strftime("%Y-%m-%dT%H:%M:%S")},
+        "solver": {name: bench_solver(boards) for name, boards in corpora.items()},
+        "generator": bench_generator(args.generate_count, args.seed),
+    }
+    if args.large_count:
+        results["large"] = bench_sizes(args.large_count, args.seed)
+    print_report(results)
+    with open(args.output, "w") as f:
+        json.dump(results, f, indent=2)
+    print(f"\nResults written to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions, skipped = compare(results, json.load(f), args.threshold)
+        for line in regressions:
+            print("REGRESSION", line)
+        for line in skipped:
+            print("NOT COMPARED", line)
+        if regressions:
+            sys.exit(1)
+        if skipped:
+            # A baseline that no longer matches must not pass as "no regressions"
+            print(f"Baseline {args.baseline} does not match this run; regenerate it")
+            sys.exit(2)
+        print("No regressions against", args.baseline)
@@ -0,0 +1,201 @@
+import dbm
+from collections import OrderedDict
+from itertools import islice, permutations, product
+
+import numpy as np
+
+from sudoku import N, get_solver
+
+# Most tie-breaking arrangements tried per orientation when canonicalising
+MAX_ARRANGEMENTS = 32
+
+def _tied_runs(items, key):
+    """Sort items by key and group them into runs of equal keys."""
+    runs = []
+    for item in sorted(items, key=key):
+        if runs and key(runs[-1][-1]) == key(item):
+            runs[-1].append(item)
+        else:
+            runs.append([item])
+    return runs
+
+def _line_orders(keys):
+    """Yield orders of 9 rows (or columns) sorted by their invariant keys, bands kept together.
+
+    Bands are sorted by the sorted keys of their rows and rows within each
+    band by their own key. Where keys tie, every arrangement of the tied
+    bands or rows is yielded in turn.
+    """
+    band_runs = _tied_runs(range(3), lambda band: sorted(keys[3 * band:3 * band + 3]))
+    for band_choice in product(*[permutations(run) for run in band_runs]):
+        bands = [band for run in band_choice for band in run]
+        row_choices = [product(*[permutations(run) for run in
+                                 _tied_runs(range(3 * band, 3 * band + 3), keys.__getitem__)])
+                       for band in bands]
+        for rows in product(*row_choices):
+            yield [row for band_rows in rows for run in band_rows for row in run]
+
+def _line_keys(filled):
+    """Return a key for each row of filled that no column transform changes."""
+    stacks = np.sort(filled.reshape(N, 3, 3).sum(2), axis=1).tolist()
+    return list(zip(filled.sum(1).tolist(), map(tuple, stacks)))
+
+def _relabel(grids):
+    """Renumber the digits of each (K, 81) grid in order of first appearance.
+
+    Returns the relabelled grids and, for each grid, the new label of each digit.
+    """
+    count = len(grids)
+    present = grids[:, :, None] == np.arange(1, N + 1)
+    first = np.where(present.any(1), present.argmax(1), N * N + np.arange(N))
+    labels = np.zeros((count, N + 1), dtype=grids.dtype)
+    labels[:, 1:] = np.argsort(np.argsort(first, axis=1), axis=1) + 1
+    return np.take_along_axis(labels, grids, axis=1), labels
+
+def canonical_form(board):
+    """Return (key, transform) for board under Sudoku symmetries.
+
+    key is the same for a board and any variant of it made by relabelling
+    digits, permuting rows within bands, bands, columns within stacks and
+    stacks, or transposing, as long as the tie-breaking search (capped at
+    MAX_ARRANGEMENTS per orientation) covers it; very symmetric boards can
+    get more than one key, which only costs cache hits. transform is what
+    to_canonical and from_canonical need to map boards to and from the key's
+    frame.
+    """
+    board = np.asarray(board).reshape(N, N)
+    candidates = []
+    for flip, grid in enumerate((board, board.T)):
+        filled = grid != 0
+        rows = list(islice(_line_orders(_line_keys(filled)), MAX_ARRANGEMENTS))
+        cols = list(islice(_line_orders(_line_keys(filled.T)), MAX_ARRANGEMENTS))
+        limit = max(1, MAX_ARRANGEMENTS // len(cols))
+        candidates += [(flip, r, c) for r in rows[:limit] for c in cols]
+    flips = np.array([flip for flip, _, _ in candidates])
+    rows = np.array([r for _, r, _ in candidates])
+    cols = np.array([c for _, _, c in candidates])
+    oriented = np.stack([board, board.T])
+    grids = oriented[flips[:, None, None], rows[:, :, None], cols[:, None, :]].reshape(len(candidates), -1)
+    grids, labels = _relabel(grids)
+    best = np.lexsort(grids.T[::-1])[0]
+    transform = (int(flips[best]), rows[best], cols[best], labels[best])
+    return grids[best].astype(np.uint8).tobytes(), transform
+
+def to_canonical(board, transform):
+    """Map board into the canonical frame described by transform."""
+    flip, rows, cols, labels = transform
+    board = np.asarray(board).reshape(N, N)
+    return labels[(board.T if flip else board)[np.ix_(rows, cols)]]
+
+def from_canonical(board, transform):
+    """Map a board in the canonical frame back to the original frame; the inverse of to_canonical."""
+    flip, rows, cols, labels = transform
+    digits = np.zeros(N + 1, dtype=int)
+    digits[labels] = np.arange(N + 1)
+    out = np.zeros((N, N), dtype=int)
+    out[np.ix_(rows, cols)] = digits[np.asarray(board).reshape(N, N)]
+    return out.T if flip else out
+
+class SolutionCache:
+    """Bounded LRU cache of solutions keyed by canonical form, in front of a solver.
+
+    An exact resubmission is looked up by the board's own bytes first, which
+    is far cheaper than canonicalising it. Otherwise a puzzle that is a
+    relabelled, permuted or transposed variant of one seen before is
+    answered by mapping the stored solution back, without solving. Each key
+    is a board and each value that board's solution, so a solved puzzle
+    takes up to two entries: its own and its canonical form's. With a path,
+    solutions are also kept in a dbm file, which outlives the in-memory
+    entries and the process.
+    """
+
+    def __init__(self, capacity=10000, path=None, solver=None):
+        self.capacity = capacity
+        self.entries = OrderedDict()   # board bytes -> solution bytes, b"" if unsolvable
+        self.store = dbm.open(path, "c") if path else None
+        self.solve_board = get_solver(solver)
+        self.exact_hits = 0
+        self.canonical_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _lookup(self, key):
+        if key in self.entries:
+            self.entries.move_to_end(key)
+            return self.entries[key]
+        if self.store is not None and key in self.store:
+            self.disk_hits += 1
+            value = self.store[key]
+            self._remember(key, value)
+            return value
+        return None
+
+    def _remember(self, key, value):
+        self.entries[key] = value
+        if len(self.entries) > self.capacity:
+            self.entries.popitem(last=False)
+            self.evictions += 1
+
+    def _store(self, key, value):
+        self._remember(key, value)
+        if self.store is not None:
+            self.store[key] = value
+
+    def solve(self, board):
+        """Solve the board in place like sudoku.solve_sudoku, using the cache where possible."""
+        if np.size(board) != N * N:
+            raise ValueError(f"SolutionCache only handles {N}x{N} boards.")
+        exact = np.asarray(board, dtype=np.uint8).tobytes()
+        value = self._lookup(exact)
+        if value is not None:
+            self.exact_hits += 1
+        else:
+            key, transform = canonical_form(board)
+            value = self._lookup(key)
+            if value is not None:
+                self.canonical_hits += 1
+            else:
+                self.misses += 1
+                canonical = to_canonical(board, transform)
+                solved = self.solve_board(canonical)
+                value = canonical.astype(np.uint8).tobytes() if solved else b""
+                self._store(key, value)
+            if value:
+                solution = np.frombuffer(value, dtype=np.uint8).astype(int)
+                value = from_canonical(solution, transform).astype(np.uint8).tobytes()
+            self._store(exact, value)
+        if not value:
+            return False
+        board[:, :] = np.frombuffer(value, dtype=np.uint8).reshape(N, N)
+        return True
+
+    def stats(self):
+        """Return hit, miss and eviction counts and the hit rate.
+
+        hits is exact_hits plus canonical_hits; disk_hits counts the entries
+        among those lookups that had to be read back from the dbm file.
+        """
+        hits = self.exact_hits + self.canonical_hits
+        lookups = hits + self.misses
+        return {
+            "hits": hits,
+            "exact_hits": self.exact_hits,
+            "canonical_hits": self.canonical_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "size": len(self.entries),
+            "hit_rate": hits / lookups if lookups else 0.0,
+        }
+
+    def close(self):
+        if self.store is not None:
+            self.store.close()
+            self.store = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,264 @@
+from itertools import islice
+
+import numpy as np
+
+from sudoku import box_size, geometry
+
+# Exact-cover matrices by box size, built once and copied for each board:
+# (left, right, up, down, column, size) lists over one node pool
+_templates = {}
+
+def _template(box):
+    """Return the linked exact-cover matrix for an empty board with boxes of box x box cells.
+
+    Node 0 is the root, nodes 1..4*side*side are the column headers (one per
+    cell, row-digit, column-digit and box-digit constraint) and candidate k
+    (cell k // side holding digit k % side + 1) owns the four consecutive
+    nodes starting at 1 + 4*side*side + 4*k, linked left to right.
+    """
+    if box in _templates:
+        return _templates[box]
+    geo = geometry(box)
+    side, cells = geo.side, geo.num_cells
+    num_columns = 4 * cells
+    total = 1 + num_columns + 4 * side * cells
+    left, right = list(range(-1, total - 1)), list(range(1, total + 1))
+    up, down = list(range(total)), list(range(total))
+    column, size = list(range(total)), [0] * (num_columns + 1)
+    left[0], right[num_columns] = num_columns, 0
+    node = num_columns + 1
+    for i in range(cells):
+        r, c, b = geo.cell_units[i]
+        for d in range(side):
+            columns = (1 + i, 1 + cells + r * side + d, 1 + 2 * cells + c * side + d,
+                       1 + 3 * cells + b * side + d)
+            for k, col in enumerate(columns):
+                left[node + k] = node + (k - 1) % 4
+                right[node + k] = node + (k + 1) % 4
+                # Append to the bottom of the column's circular list
+                column[node + k] = col
+                up[node + k], down[node + k] = up[col], col
+                down[up[col]] = node + k
+                up[col] = node + k
+                size[col] += 1
+            node += 4
+    _templates[box] = left, right, up, down, column, size
+    return _templates[box]
+
+class DancingLinks:
+    """Knuth's Algorithm X with dancing links, for finding every solution of a board.
+
+    The exact-cover matrix lives in flat preallocated lists of node links,
+    copied from a per-size template, so covering and uncovering a column
+    only rewrites list entries. The board's givens are covered up front, and
+    the search runs on an explicit stack, so it can be paused between
+    solutions and resumed.
+    """
+
+    def __init__(self, board):
+        box = box_size(board)
+        self.side = box * box
+        self.cells = np.asarray(board).ravel().tolist()
+        self.num_columns = 4 * len(self.cells)
+        self.left, self.right, self.up, self.down, self.column, self.size = (
+            list(links) for links in _template(box))
+        self.given = []   # First node of each given's candidate row
+        self.nodes = 0
+        self.consistent = True
+        covered = set()
+        for i, num in enumerate(self.cells):
+            if not num:
+                continue
+            row = self.num_columns + 1 + 4 * (i * self.side + num - 1)
+            columns = [self.column[row + k] for k in range(4)]
+            if covered.intersection(columns):
+                self.consistent = False
+                return
+            covered.update(columns)
+            for col in columns:
+                self._cover(col)
+            self.given.append(row)
+
+    def _cover(self, col):
+        """Unlink col from the header list and every row crossing it from their other columns."""
+        left, right, up, down, column, size = self.left, self.right, self.up, self.down, self.column, self.size
+        right[left[col]], left[right[col]] = right[col], left[col]
+        i = down[col]
+        while i != col:
+            j = right[i]
+            while j != i:
+                down[up[j]], up[down[j]] = down[j], up[j]
+                size[column[j]] -= 1
+                j = right[j]
+            i = down[i]
+
+    def _uncover(self, col):
+        """Undo _cover(col), relinking in exactly the reverse order."""
+        left, right, up, down, column, size = self.left, self.right, self.up, self.down, self.column, self.size
+        i = up[col]
+        while i != col:
+            j = left[i]
+            while j != i:
+                size[column[j]] += 1
+                down[up[j]] = up[down[j]] = j
+                j = left[j]
+            i = up[i]
+        right[left[col]] = col
+        left[right[col]] = col
+
+    def _search(self):
+        """Yield the stack of chosen rows at each solution.
+
+        The matrix is back in its starting state once the search is exhausted
+        or the generator is closed. Covering and uncovering are written out
+        inline, as the method calls would otherwise dominate the search.
+        """
+        left, right, up, down, column, size = self.left, self.right, self.up, self.down, self.column, self.size
+        num_columns = self.num_columns
+        if not right[0]:
+            yield []
+            return
+        stack = []
+        nodes = 0
+        row = 0   # Header of the last column covered, or the row being tried in it
+        while True:
+            if row == 0 or row > num_columns:
+                if row:
+                    # Choose the row: cover its other columns, left to right
+                    nodes += 1
+                    j = right[row]
+                    while j != row:
+                        col = column[j]
+                        right[left[col]], left[right[col]] = right[col], left[col]
+                        i = down[col]
+                        while i != col:
+                            k = right[i]
+                            while k != i:
+                                down[up[k]], up[down[k]] = down[k], up[k]
+                                size[column[k]] -= 1
+                                k = right[k]
+                            i = down[i]
+                        j = right[j]
+                    stack.append(row)
+                    if not right[0]:
+                        try:
+                            yield stack
+                        except GeneratorExit:
+                            self.nodes += nodes
+                            self._unwind(stack)
+                            raise
+                        row = stack[-1]
+                        # Fall through to release the row and try the next one
+                if right[0]:
+                    # Cover the column with fewest rows left and start on its first row
+                    col = right[0]
+                    best, fewest = col, size[col]
+                    while col and fewest > 1:
+                        if size[col] < fewest:
+                            best, fewest = col, size[col]
+                        col = right[col]
+                    col = best
+                    right[left[col]], left[right[col]] = right[col], left[col]
+                    i = down[col]
+                    while i != col:
+                        k = right[i]
+                        while k != i:
+                            down[up[k]], up[down[k]] = down[k], up[k]
+                            size[column[k]] -= 1
+                            k = right[k]
+                        i = down[i]
+                    row = down[col]
+                    continue
+            else:
+                # Every row of this column tried: uncover it and back up a level
+                col = row
+                i = up[col]
+                while i != col:
+                    k = left[i]
+                    while k != i:
+                        size[column[k]] += 1
+                        down[up[k]] = up[down[k]] = k
+                        k = left[k]
+                    i = up[i]
+                right[left[col]] = left[right[col]] = col
+                if not stack:
+                    self.nodes += nodes
+                    return
+            # Release the row on top of the stack, right to left, and move to the next one
+            row = stack.pop()
+            j = left[row]
+            while j != row:
+                col = column[j]
+                i = up[col]
+                while i != col:
+                    k = left[i]
+                    while k != i:
+                        size[column[k]] += 1
+                        down[up[k]] = up[down[k]] = k
+                        k = left[k]
+                    i = up[i]
+                right[left[col]] = left[right[col]] = col
+                j = left[j]
+            row = down[row]
+
+    def _unwind(self, stack):
+        """Release every chosen row and its column, restoring the matrix mid-search."""
+        for row in reversed(stack):
+            j = self.left[row]
+            while j != row:
+                self._uncover(self.column[j])
+                j = self.left[j]
+            self._uncover(self.column[row])
+
+    def _board(self, rows):
+        """Return the board with the givens and the candidates of rows filled in."""
+        out = list(self.cells)
+        for row in rows:
+            k = (row - self.num_columns - 1) // 4
+            out[k // self.side] = k % self.side + 1
+        return np.array(out).reshape(self.side, self.side)
+
+    def solutions(self):
+        """Yield every solution of the board as a new array."""
+        if not self.consistent:
+            return
+        search = self._search()
+        try:
+            for rows in search:
+                yield self._board(rows)
+        finally:
+            search.close()
+
+    def solve(self):
+        """Return the first solution found, or None if the board has none."""
+        solutions = self.solutions()
+        try:
+            return next(solutions, None)
+        finally:
+            solutions.close()
+
+    def count_solutions(self, limit=None):
+        """Return the number of solutions, stopping once limit (if given) are found."""
+        if not self.consistent:
+            return 0
+        search = self._search()
+        try:
+            return sum(1 for _ in islice(search, limit))
+        finally:
+            search.close()
+
+def solve_dlx(board):
+    """Solve the board in place with dancing links; return True if a solution was found."""
+    solution = DancingLinks(board).solve()
+    if solution is None:
+        return False
+    board[:, :] = solution
+    return True
+
+def count_solutions(board, limit=None):
+    """Count the solutions of the board with dancing links, stopping early once limit is reached."""
+    return DancingLinks(board).count_solutions(limit)
+
+def iter_solutions(board):
+    """Yield every solution of the board, each as a new array."""
+    return DancingLinks(board).solutions()
@@ -1,20 +1,40 @@
+import argparse
 import tkinter as tk
 from tkinter import messagebox
 import numpy as np
+import os
+import queue
 import random
+import threading
 
-# Sudoku board size
-N = 9
+from puzzle_bank import DEFAULT_BANK_PATH, PuzzleBank
+from sudoku import (DEFAULT_SOLVER, DIFFICULTY_REMOVALS, N, SOLVERS, BitmaskSolver, ConflictIndex,
+                    SudokuStepper, fill_board, get_solver)
+
+# How often the Tk loop checks for worker results, and how much search
+# the solver worker does between progress reports and cancel checks
+POLL_INTERVAL_MS = 50
+NODES_PER_SLICE = 200
 
 class SudokuApp:
-    def __init__(self, root):
+    def __init__(self, root, solver=DEFAULT_SOLVER):
         self.root = root
+        self.solver = solver  # Name of the sudoku.SOLVERS backend used by Solve
         self.root.title("Sudoku")
         self.board = np.zeros((N, N), dtype=int)
+        self.givens = np.zeros((N, N), dtype=bool)  # Cells filled in by the puzzle itself
+        self.solution = None
+        self.conflicts = ConflictIndex(self.board)
+        self.marked_cells = set()  # Cells currently highlighted as conflicting
         self.timer_running = False
         self.paused = False
         self.time_elapsed = 0
         self.selected_row, self.selected_col = None, None  # To track selected cell
+        self.bank = self.open_bank()
+        # Background work: one worker thread at a time, reporting through a queue
+        self.worker = None
+        self.worker_results = queue.Queue()
+        self.cancel_requested = threading.Event()
         # Bind arrow keys for navigation
         self.root.bind("<Up>", self.move_up)
         self.root.bind("<Down>", self.move_down)
@@ -51,6 +71,9 @@ class SudokuApp:
             self.canvas.create_line(i * cell_size, 0, i * cell_size, N * cell_size, width=line_width)
             self.canvas.create_line(0, i * cell_size, N * cell_size, i * cell_size, width=line_width)
 
+        # A single highlight rectangle, moved around rather than redrawn
+        self.highlight = self.canvas.create_rectangle(0, 0, cell_size, cell_size, outline="red",
+                                                      width=3, state='hidden')
 
         # Bind key presses to the canvas
         self.canvas.bind("<Key>", self.on_key_press)
@@ -61,8 +84,9 @@ class SudokuApp:
         self.resume_button.grid(row=2, column=1, padx=10)
         self.resume_button.grid_remove()  # Initially hidden
 
-        # Create a 2D list of Entry widgets
+        # Create a 2D list of Entry widgets, and what each one currently shows
         self.entries = [[None for _ in range(N)] for _ in range(N)]
+        self.shown = [[(0, False) for _ in range(N)] for _ in range(N)]  # (value, readonly)
         for i in range(N):
             for j in range(N):
                 x0 = j * cell_size + 5
@@ -79,6 +103,19 @@ class SudokuApp:
         self.solve_button = tk.Button(self.root, text="Solve", command=self.solve_board)
         self.solve_button.grid(row=N, column=0, columnspan=N, pady=10)
 
+        self.new_game_button = tk.Button(self.root, text="New Game", command=self.generate_sudoku)
+        self.new_game_button.grid(row=1, column=2, padx=10)
+
+        self.hint_button = tk.Button(self.root, text="Hint", command=self.give_hint)
+        self.hint_button.grid(row=N + 1, column=0, columnspan=3, pady=5)
+
+        # Progress of background work, with a Cancel button shown only while it runs
+        self.status_label = tk.Label(self.root, text="", font=('Arial', 10))
+        self.status_label.grid(row=2, column=0, padx=10)
+        self.cancel_button = tk.Button(self.root, text="Cancel", command=self.cancel_work)
+        self.cancel_button.grid(row=2, column=2, padx=10)
+        self.cancel_button.grid_remove()
+
 
     def find_first_open_cell(self):
         """Find the first open (empty) cell to start with."""
@@ -91,25 +128,6 @@ class SudokuApp:
 
 
 
-    def redraw_grid(self):
-        """Redraw the grid without resetting numbers."""
-        # Clear current grid visuals
-        self.canvas.delete("highlight")  # Delete only the highlight (not numbers)
-
-        # Draw lines for grid (same as the function that draws the grid lines)
-        for i in range(10):
-            width = 3 if i % 3 == 0 else 1  # Bold lines for the 3x3 blocks
-            self.canvas.create_line(50 * i, 0, 50 * i, 450, fill="black", width=width)
-            self.canvas.create_line(0, 50 * i, 450, 50 * i, fill="black", width=width)
-
-        # Highlight selected cell
-        if self.selected_row is not None and self.selected_col is not None:
-            self.canvas.create_rectangle(self.selected_col * 50, self.selected_row * 50,
-                                         (self.selected_col + 1) * 50, (self.selected_row + 1) * 50,
-                                         outline="red", width=3, tags="highlight")
-
-
-
     def on_key_press(self, event):
         """Handle key press event to input numbers into the grid."""
         # Check if a number key is pressed (1-9)
@@ -119,33 +137,31 @@ class SudokuApp:
                 # Get the current position of the highlighted cell
                 row, col = self.selected_row, self.selected_col
 
-                # Check if the cell is not pre-filled (allow input in empty cells only)
-                if self.grid[row][col] == 0:  # Assuming 0 represents an empty cell
-                    self.grid[row][col] = int(event.char)  # Set the cell value to the pressed number
-                    self.redraw_grid()  # Update the display with the new value
+                # Check if the cell is not pre-filled (allow input in open cells only)
+                if not self.givens[row][col]:
+                    entry = self.entries[row][col]
+                    entry.delete(0, tk.END)
+                    entry.insert(0, event.char)
+                    self.record_entry(row, col, int(event.char))
 
 
 
 
     def highlight_selected_cell(self):
-        """Highlight the currently selected cell."""
-        # Redraw the board to clear previous highlights
-        #self.draw_board()
-        self.redraw_grid()
-
-        # Highlight the selected cell (make sure it's within bounds)
-        """
-        if self.selected_row is not None and self.selected_col is not None:
-            self.canvas.create_rectangle(self.selected_col * 50, self.selected_row * 50,
-                                         (self.selected_col + 1) * 50, (self.selected_row + 1) * 50,
-                                         outline="red", width=3)
-        """
+        """Move the highlight rectangle to the currently selected cell."""
+        if self.selected_row is None or self.selected_col is None:
+            self.canvas.itemconfigure(self.highlight, state='hidden')
+            return
+        self.canvas.coords(self.highlight, self.selected_col * 50, self.selected_row * 50,
+                           (self.selected_col + 1) * 50, (self.selected_row + 1) * 50)
+        self.canvas.itemconfigure(self.highlight, state='normal')
+        self.canvas.tag_raise(self.highlight)
 
     def move_up(self, event):
         """Move the selection up."""
         if self.selected_row is not None:
             next_row = (self.selected_row - 1) % 9  # Loop back to bottom if at the top
-            while self.board[next_row][self.selected_col] != 0:
+            while self.givens[next_row][self.selected_col]:
                 next_row = (next_row - 1) % 9
             self.selected_row = next_row
             self.highlight_selected_cell()
@@ -154,7 +170,7 @@ class SudokuApp:
         """Move the selection down."""
         if self.selected_row is not None:
             next_row = (self.selected_row + 1) % 9  # Loop back to top if at the bottom
-            while self.board[next_row][self.selected_col] != 0:
+            while self.givens[next_row][self.selected_col]:
                 next_row = (next_row + 1) % 9
             self.selected_row = next_row
             self.highlight_selected_cell()
@@ -163,7 +179,7 @@ class SudokuApp:
         """Move the selection left."""
         if self.selected_col is not None:
             next_col = (self.selected_col - 1) % 9  # Loop back to the rightmost column if at the left
-            while self.board[self.selected_row][next_col] != 0:
+            while self.givens[self.selected_row][next_col]:
                 next_col = (next_col - 1) % 9
             self.selected_col = next_col
             self.highlight_selected_cell()
@@ -172,7 +188,7 @@ class SudokuApp:
         """Move the selection right."""
         if self.selected_col is not None:
             next_col = (self.selected_col + 1) % 9  # Loop back to the leftmost column if at the right
-            while self.board[self.selected_row][next_col] != 0:
+            while self.givens[self.selected_row][next_col]:
                 next_col = (next_col + 1) % 9
             self.selected_col = next_col
             self.highlight_selected_cell()
@@ -235,118 +251,204 @@ class SudokuApp:
 
 
 
+    def start_work(self, kind, target, *args):
+        """Run target(*args) on a worker thread; it reports back through self.worker_results."""
+        if self.worker is not None and self.worker.is_alive():
+            return False
+        self.cancel_requested.clear()
+        self.worker = threading.Thread(target=target, args=args, daemon=True)
+        self.worker.start()
+        self.status_label.config(text="Solving..." if kind == 'solve' else "Generating...")
+        self.solve_button.config(state='disabled')
+        self.new_game_button.config(state='disabled')
+        self.cancel_button.grid()
+        self.root.after(POLL_INTERVAL_MS, self.poll_work)
+        return True
+
+    def cancel_work(self):
+        """Ask the running worker to stop."""
+        self.cancel_requested.set()
+        self.status_label.config(text="Cancelling...")
+
+    def finish_work(self, message=""):
+        """Restore the controls once the worker has reported its final result."""
+        self.status_label.config(text=message)
+        self.solve_button.config(state='normal')
+        self.new_game_button.config(state='normal')
+        self.cancel_button.grid_remove()
+
+    def poll_work(self):
+        """Handle everything the worker has reported so far; runs on the Tk main loop."""
+        done = False
+        while True:
+            try:
+                kind, payload = self.worker_results.get_nowait()
+            except queue.Empty:
+                break
+            if kind == 'progress':
+                self.status_label.config(text=f"Solving... {payload} nodes")
+            elif kind == 'solved':
+                self.board = payload
+                self.conflicts = ConflictIndex(self.board, self.solution)
+                self.update_grid()
+                self.refresh_conflicts()
+                self.finish_work("Solved")
+                messagebox.showinfo("Sudoku Solver", "The board has been solved!")
+                done = True
+            elif kind == 'unsolvable':
+                self.finish_work()
+                messagebox.showerror("Solver Error", "The board could not be solved.")
+                done = True
+            elif kind == 'generated':
+                self.board, self.solution = payload
+                self.givens = self.board != 0
+                self.conflicts = ConflictIndex(self.board, self.solution)
+                self.update_grid()
+                self.refresh_conflicts()
+                self.find_first_open_cell()
+                self.finish_work()
+                done = True
+            elif kind == 'cancelled':
+                self.finish_work("Cancelled")
+                done = True
+        if not done:
+            self.root.after(POLL_INTERVAL_MS, self.poll_work)
+
     def generate_sudoku(self):
-        """Generate and display a Sudoku board."""
-        self.board = self.generate_board()
-        self.update_grid()
+        """Generate a Sudoku board in the background and display it when ready."""
+        self.start_work('generate', self.generate_worker)
+
+    def generate_worker(self):
+        """Worker thread: build a new board and hand it to the Tk loop."""
+        board, solution = self.generate_board()
+        if self.cancel_requested.is_set():
+            self.worker_results.put(('cancelled', None))
+        else:
+            self.worker_results.put(('generated', (board, solution)))
+
+    def open_bank(self):
+        """Open the pre-generated puzzle bank next to this file, if one has been built."""
+        path = os.path.join(os.path.dirname(os.path.abspath(__file__)), DEFAULT_BANK_PATH)
+        if not os.path.exists(path):
+            return None
+        try:
+            return PuzzleBank(path)
+        except ValueError:
+            return None
 
     def generate_board(self):
-        """Generate a Sudoku board with a valid solution."""
+        """Generate a Sudoku board with a valid solution; return (board, solution)."""
+        if self.bank is not None and self.bank.count('easy'):
+            return self.bank.random_puzzle('easy')
+
         board = np.zeros((N, N), dtype=int)
-        self.fill_board(board)
-        
+        fill_board(board)
+        solution = board.copy()
+
         # Remove cells for the puzzle
-        num_cells_to_remove = random.randint(35, 40)  # Adjust for difficulty
+        num_cells_to_remove = random.randint(*DIFFICULTY_REMOVALS['easy'])
         cells = [(i, j) for i in range(N) for j in range(N)]
         random.shuffle(cells)
         for i in range(num_cells_to_remove):
             row, col = cells[i]
             board[row, col] = 0
 
-        self.find_first_open_cell()
-            
-        return board
-
-    def fill_board(self, board):
-        """Fill the Sudoku board with a valid solution."""
-        numbers = list(range(1, 10))
-        def fill_box(row_start, col_start):
-            """Fill a 3x3 box with random valid numbers."""
-            numbers_copy = numbers[:]
-            random.shuffle(numbers_copy)
-            for i in range(3):
-                for j in range(3):
-                    num = numbers_copy.pop()
-                    while not self.is_valid(board, row_start + i, col_start + j, num):
-                        if not numbers_copy:
-                            numbers_copy = numbers[:]
-                            random.shuffle(numbers_copy)
-                        num = numbers_copy.pop()
-                    board[row_start + i, col_start + j] = num
-
-        # Fill the diagonal 3x3 boxes
-        for i in range(0, N, 3):
-            fill_box(i, i)
-        
-        # Solve the filled board
-        self.solve_sudoku(board)
+        return board, solution
 
     def update_grid(self):
-        """Update the grid with the current board state."""
+        """Update the grid with the current board state, touching only cells that changed."""
         for i in range(N):
             for j in range(N):
-                value = self.board[i, j]
+                value = int(self.board[i, j])
+                wanted = (value, value != 0)
+                # Typing is only recorded on focus-out, so check the Entry's
+                # own text too, or an unrecorded digit would survive a new board
+                if self.shown[i][j] == wanted and self.entries[i][j].get() == (str(value) if value else ''):
+                    continue
+                self.entries[i][j].config(state='normal')
                 self.entries[i][j].delete(0, tk.END)
                 if value != 0:
                     self.entries[i][j].insert(0, str(value))
                     self.entries[i][j].config(state='readonly')
+                self.shown[i][j] = wanted
 
     def validate_entry(self, row, col):
-        """Validate the entry in the given cell."""
+        """Validate the entry in the given cell and record it on the board."""
+        if self.givens[row][col]:
+            return
         entry = self.entries[row][col]
         value = entry.get()
+        num = 0
         if value.isdigit() and 1 <= int(value) <= 9:
             num = int(value)
-            if not self.is_valid(self.board, row, col, num):
-                messagebox.showerror("Invalid Move", "This number is not valid in this position!")
-                entry.delete(0, tk.END)
-        else:
-            if value:
-                messagebox.showerror("Invalid Entry", "Please enter a number between 1 and 9!")
-                entry.delete(0, tk.END)
-
-    def is_valid(self, board, row, col, num):
-        """Check if placing num in board[row][col] is valid."""
-        if num in board[row]:
-            return False
-        if num in board[:, col]:
-            return False
-        start_row, start_col = 3 * (row // 3), 3 * (col // 3)
-        if num in board[start_row:start_row + 3, start_col:start_col + 3]:
-            return False
-        return True
+        elif value:
+            messagebox.showerror("Invalid Entry", "Please enter a number between 1 and 9!")
+            entry.delete(0, tk.END)
+        self.record_entry(row, col, num)
+
+    def record_entry(self, row, col, num):
+        """Store a player's entry (0 to clear) and update the conflict highlighting."""
+        if self.board[row, col] == num:
+            return
+        self.board[row, col] = num
+        self.shown[row][col] = (num, False)  # The Entry already holds what was typed
+        self.conflicts.set(row, col, num)
+        self.refresh_conflicts()
+        if self.conflicts.is_complete():
+            messagebox.showinfo("Sudoku", "Puzzle complete!")
+
+    def refresh_conflicts(self):
+        """Highlight every conflicting cell, touching only cells whose state changed."""
+        conflicting = self.conflicts.conflicting_cells()
+        for row, col in conflicting ^ self.marked_cells:
+            color = '#ffb0b0' if (row, col) in conflicting else 'white'
+            self.entries[row][col].config(bg=color, readonlybackground=color)
+        self.marked_cells = conflicting
+
+    def give_hint(self):
+        """Fill in (or correct) one cell from the known solution."""
+        hint = self.conflicts.hint()
+        if hint is None:
+            return
+        row, col, num = hint
+        entry = self.entries[row][col]
+        entry.delete(0, tk.END)
+        entry.insert(0, str(num))
+        self.record_entry(row, col, num)
 
     def solve_board(self):
-        """Solve the Sudoku board and update the grid."""
-        if self.solve_sudoku(self.board):
-            self.update_grid()
-            messagebox.showinfo("Sudoku Solver", "The board has been solved!")
+        """Solve the Sudoku board in the background and update the grid when done."""
+        self.start_work('solve', self.solve_worker, np.where(self.givens, self.board, 0))
+
+    def solve_worker(self, board):
+        """Worker thread: solve board, reporting progress and honouring Cancel.
+
+        The optimized solver runs in slices so it can report progress and stop
+        early; other backends run to completion and are cancelled afterwards.
+        """
+        if self.solver != 'optimized':
+            solved = get_solver(self.solver)(board)
+            if self.cancel_requested.is_set():
+                self.worker_results.put(('cancelled', None))
+            else:
+                self.worker_results.put(('solved', board) if solved else ('unsolvable', None))
+            return
+        stepper = SudokuStepper(BitmaskSolver(board))
+        while stepper.step(max_nodes=NODES_PER_SLICE) == SudokuStepper.RUNNING:
+            if self.cancel_requested.is_set():
+                stepper.cancel()
+                break
+            self.worker_results.put(('progress', stepper.solver.nodes))
+        if stepper.status == SudokuStepper.SOLVED:
+            self.worker_results.put(('solved', stepper.board()))
         else:
-            messagebox.showerror("Solver Error", "The board could not be solved.")
-
-    def solve_sudoku(self, board):
-        """Solve the Sudoku board using backtracking."""
-        empty = self.find_empty_location(board)
-        if not empty:
-            return True  # Puzzle solved
-        row, col = empty
-        for num in range(1, N + 1):
-            if self.is_valid(board, row, col, num):
-                board[row, col] = num
-                if self.solve_sudoku(board):
-                    return True
-                board[row, col] = 0  # Undo placement
-        return False
-
-    def find_empty_location(self, board):
-        """Find an empty location on the board."""
-        for row in range(N):
-            for col in range(N):
-                if board[row, col] == 0:
-                    return row, col
-        return None
+            self.worker_results.put((stepper.status, None))
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Play Sudoku.")
+    parser.add_argument("--solver", choices=list(SOLVERS), default=DEFAULT_SOLVER,
+                        help="solver backend used by the Solve button")
+    args = parser.parse_args()
     root = tk.Tk()
-    app = SudokuApp(root)
+    app = SudokuApp(root, args.solver)
     root.mainloop()
@@ -1,172 +1,242 @@
-import pygame
+import argparse
+import math
 import random
 
+import pygame
+
+from pong_profile import FrameProfiler
+from pong_replay import Replay, ReplayRecorder
+from pong_sim import (AI_DIFFICULTIES, AI_X, BALL_RADIUS, DOWN, HEIGHT, PADDLE_HEIGHT,
+                      PADDLE_WIDTH, PLAYER_X, STAY, TICK_RATE, UP, WIDTH, FixedStepScheduler,
+                      PredictiveAI, advance, new_state)
+
 # Initialize pygame
 pygame.init()
 
 # Set up display
-WIDTH, HEIGHT = 800, 600
 screen = pygame.display.set_mode((WIDTH, HEIGHT))
 pygame.display.set_caption("Pong with SuperHot Mechanics, AI Opponent, and Spin")
 
 # Colors
 WHITE = (255, 255, 255)
 BLACK = (0, 0, 0)
-
-# Paddle class
-class Paddle:
-    def __init__(self, x):
-        self.width = 15
-        self.height = 100
-        self.x = x
-        self.y = HEIGHT // 2 - self.height // 2
-        self.speed = 5
-        self.score = 0
-
-    def move(self, dy):
-        self.y += dy
-        # Ensure paddle stays on the screen
-        if self.y < 0:
-            self.y = 0
-        elif self.y + self.height > HEIGHT:
-            self.y = HEIGHT - self.height
-
-    def draw(self):
-        pygame.draw.rect(screen, WHITE, (self.x, self.y, self.width, self.height))
-
-# Ball class
-class Ball:
-    def __init__(self):
-        self.radius = 10
-        self.x = WIDTH // 2
-        self.y = HEIGHT // 2
-        self.dx = 3 * random.choice([-1, 1])
-        self.dy = 3 * random.choice([-1, 1])
-        self.spin_factor = 1  # Adjust this to control spin intensity
-
-    def move(self, factor):
-        # Move the ball based on the player's movement factor
-        self.x += self.dx * factor
-        self.y += self.dy * factor
-        # Bounce off top and bottom walls
-        if self.y - self.radius <= 0 or self.y + self.radius >= HEIGHT:
-            self.dy *= -1
-
-    def draw(self):
-        pygame.draw.circle(screen, WHITE, (self.x, self.y), self.radius)
-
-    def reset_position(self):
-        self.x = WIDTH // 2
-        self.y = HEIGHT // 2
-        self.dx = 3 * random.choice([-1, 1])
-        self.dy = 3 * random.choice([-1, 1])
-
-    def apply_spin(self, paddle):
-        # Calculate the difference between the center of the paddle and the impact point
-        paddle_center = paddle.y + paddle.height // 2
-        impact_distance = self.y - paddle_center
-
-        # Normalize impact distance to be between -1 and 1
-        max_distance = paddle.height // 2
-        normalized_impact = impact_distance / max_distance
-
-        # Apply spin to the ball's vertical speed (dy)
-        self.dy += normalized_impact * self.spin_factor
-
-# AI paddle movement
-def ai_move(ai_paddle, ball):
-    if ai_paddle.y + ai_paddle.height / 2 < ball.y:
-        ai_paddle.move(ai_paddle.speed)
-    elif ai_paddle.y + ai_paddle.height / 2 > ball.y:
-        ai_paddle.move(-ai_paddle.speed)
-
-# Draw score on screen
-def draw_score(paddle, ai_paddle):
-    font = pygame.font.Font(None, 36)
-    player_text = font.render(f"Player: {paddle.score}", True, WHITE)
-    ai_text = font.render(f"AI: {ai_paddle.score}", True, WHITE)
-    screen.blit(player_text, (50, 20))
-    screen.blit(ai_text, (WIDTH - 150, 20))
-
-# Game loop
-def main():
+# Profiler overlay: one color per FrameProfiler phase, stacked in the frame-time graph
+PHASE_COLORS = {
+    'events': (200, 80, 200),
+    'idle': (60, 60, 60),
+    'input': (80, 200, 200),
+    'simulate': (80, 200, 80),
+    'draw': (220, 200, 60),
+    'present': (220, 90, 60),
+}
+OVERLAY_FRAMES = 120      # Frames shown in the graph, 3 pixels each
+OVERLAY_MS_PER_PIXEL = 0.5
+
+class Renderer:
+    """Draws the match from cached surfaces and updates only the parts of the screen that changed.
+
+    The font and the paddle and ball sprites are made once, score text is
+    rendered again only when a score changes, and each frame erases the
+    previous frame's sprites and passes just those rectangles to
+    pygame.display.update instead of flipping the whole screen.
+    """
+
+    def __init__(self, surface):
+        self.surface = surface
+        self.font = pygame.font.Font(None, 36)
+        self.paddle = pygame.Surface((PADDLE_WIDTH, PADDLE_HEIGHT)).convert()
+        self.paddle.fill(WHITE)
+        self.ball = pygame.Surface((2 * BALL_RADIUS, 2 * BALL_RADIUS)).convert()
+        self.ball.fill(BLACK)
+        self.ball.set_colorkey(BLACK)
+        pygame.draw.circle(self.ball, WHITE, (BALL_RADIUS, BALL_RADIUS), BALL_RADIUS)
+        self.scores = None   # (player, ai) scores shown in score_texts
+        self.score_texts = []
+        self.score_rects = []
+        self.drawn = []      # Sprite rects drawn last frame, erased on the next
+        self.dirty = []
+        self.full_redraw = True
+        self.overlay_font = pygame.font.Font(None, 20)
+        self.overlay = pygame.Surface((3 * OVERLAY_FRAMES, 100)).convert()
+        self.overlay_rect = self.overlay.get_rect(midbottom=(WIDTH // 2, HEIGHT - 10))
+        self.show_overlay = False
+
+    def toggle_overlay(self):
+        """Show or hide the profiler overlay."""
+        self.show_overlay = not self.show_overlay
+        self.full_redraw = True  # Uncover whatever the overlay was hiding
+
+    def update_scores(self, state):
+        """Render the score text again if either score changed; return True if it did."""
+        scores = (state.player_score, state.ai_score)
+        if scores == self.scores:
+            return False
+        self.scores = scores
+        self.score_texts = [
+            (self.font.render(f"Player: {state.player_score}", True, WHITE), (50, 20)),
+            (self.font.render(f"AI: {state.ai_score}", True, WHITE), (WIDTH - 150, 20)),
+        ]
+        return True
+
+    def draw(self, state, profiler=None):
+        """Draw one frame of state onto the surface, with the profiler overlay if it is shown."""
+        for rect in self.drawn:
+            self.surface.fill(BLACK, rect)
+        dirty = self.drawn
+        self.drawn = [
+            self.paddle.get_rect(topleft=(PLAYER_X, state.player_y)),
+            self.paddle.get_rect(topleft=(AI_X, state.ai_y)),
+            self.ball.get_rect(center=(state.ball_x, state.ball_y)),
+        ]
+        dirty += self.drawn
+
+        # Score text is anti-aliased, so it is redrawn onto a cleared background, and
+        # only when it changed or a sprite moved across it
+        if self.update_scores(state):
+            stale = self.score_rects
+            self.score_rects = [text.get_rect(topleft=position) for text, position in self.score_texts]
+            for rect in stale:
+                self.surface.fill(BLACK, rect)
+            dirty += stale
+            redraw_scores = list(range(len(self.score_texts)))
+        elif self.full_redraw:
+            redraw_scores = list(range(len(self.score_texts)))
+        else:
+            redraw_scores = [k for k, rect in enumerate(self.score_rects) if rect.collidelist(dirty) != -1]
+        if self.full_redraw:
+            self.surface.fill(BLACK)
+        for k in redraw_scores:
+            self.surface.fill(BLACK, self.score_rects[k])
+            dirty.append(self.score_rects[k])
+
+        for sprite, rect in zip((self.paddle, self.paddle, self.ball), self.drawn):
+            self.surface.blit(sprite, rect)
+        for k in redraw_scores:
+            text, position = self.score_texts[k]
+            self.surface.blit(text, position)
+
+        if self.show_overlay and profiler is not None:
+            self.draw_overlay(profiler)
+            dirty.append(self.overlay_rect)
+        self.dirty = dirty
+
+    def draw_overlay(self, profiler):
+        """Draw the FPS, mean phase times and a stacked frame-time graph over the game."""
+        overlay = self.overlay
+        overlay.fill((20, 20, 20))
+        height = overlay.get_height()
+        for k, frame in enumerate(profiler.recent(OVERLAY_FRAMES)):
+            bottom = height
+            for phase, seconds in zip(profiler.PHASES, frame[2:]):
+                pixels = 1000 * seconds / OVERLAY_MS_PER_PIXEL
+                if pixels >= 0.5:
+                    overlay.fill(PHASE_COLORS[phase], (3 * k, bottom - pixels, 3, pixels))
+                bottom -= pixels
+        budget = height - 1000 / TICK_RATE / OVERLAY_MS_PER_PIXEL
+        pygame.draw.line(overlay, WHITE, (0, budget), (overlay.get_width(), budget))
+
+        means = profiler.phase_means()
+        lines = [f"{profiler.fps():.0f} fps  {sum(means.values()):.1f} ms/frame",
+                 "  ".join(f"{phase} {ms:.1f}" for phase, ms in means.items() if phase != 'idle')]
+        for row, line in enumerate(lines):
+            overlay.blit(self.overlay_font.render(line, True, WHITE), (4, 4 + 16 * row))
+        self.surface.blit(overlay, self.overlay_rect)
+
+    def present(self):
+        """Push the areas changed by the last draw to the display."""
+        if self.full_redraw:
+            pygame.display.flip()
+            self.full_redraw = False
+        else:
+            pygame.display.update(self.dirty)
+
+def read_move():
+    """Turn the arrow keys into the player's move for this tick."""
+    keys = pygame.key.get_pressed()
+    if keys[pygame.K_UP]:
+        return UP
+    elif keys[pygame.K_DOWN]:
+        return DOWN
+    return STAY
+
+# Game loop: the simulation in pong_sim does the work, this just feeds it input and draws it
+def main(ai=None, seed=None, record=None, replay=None, speed=1.0, fps=TICK_RATE, profile=None):
+    """Play a match, optionally recording the input to a file or showing a recorded one.
+
+    replay is a pong_replay.Replay whose moves are used instead of the keyboard;
+    speed scales how fast it is shown. fps caps the frame rate: the simulation
+    runs at TICK_RATE whatever it is. F3 toggles the profiler overlay, and
+    profile is a .csv or .json path to write the frame timings to at exit.
+    """
     clock = pygame.time.Clock()
-
-    # Create player, AI paddles and the ball
-    player_paddle = Paddle(x=50)
-    ai_paddle = Paddle(x=WIDTH - 65)
-    ball = Ball()
+    scheduler = FixedStepScheduler(max_ticks=math.ceil(8 * speed))
+    profiler = FrameProfiler()
+    if replay is not None:
+        state = replay.new_state()
+        moves = replay.iter_moves()
+    else:
+        seed = random.getrandbits(32) if seed is None else seed
+        state = new_state(seed, ai)
+    recorder = ReplayRecorder(record, seed, ai) if record and replay is None else None
+    renderer = Renderer(screen)
 
     running = True
-    ball_moving = False  # Ball will only move when player moves
-    win_score = 5
-
     while running:
-        screen.fill(BLACK)
-
-        # Paddle movement
-        keys = pygame.key.get_pressed()
-        player_movement = 0
-        if keys[pygame.K_UP]:
-            player_movement = -player_paddle.speed
-        elif keys[pygame.K_DOWN]:
-            player_movement = player_paddle.speed
-
-        # If player moves the paddle, the ball moves proportionally
-        movement_factor = abs(player_movement) / player_paddle.speed if player_movement != 0 else 0
-
-        player_paddle.move(player_movement)
-
-        # Move ball only if player moved the paddle
-        if movement_factor > 0:
-            ball.move(movement_factor)
-
-        # Move AI paddle
-        ai_move(ai_paddle, ball)
-
-        # Check for paddle-ball collision (Player)
-        if ball.x - ball.radius <= player_paddle.x + player_paddle.width:
-            if player_paddle.y < ball.y < player_paddle.y + player_paddle.height:
-                ball.dx *= -1  # Reverse ball direction
-                ball.apply_spin(player_paddle)  # Apply spin based on impact location
-
-        # Check for paddle-ball collision (AI)
-        if ball.x + ball.radius >= ai_paddle.x:
-            if ai_paddle.y < ball.y < ai_paddle.y + ai_paddle.height:
-                ball.dx *= -1  # Reverse ball direction
-                ball.apply_spin(ai_paddle)  # Apply spin based on impact location
-
-        # Scoring
-        if ball.x - ball.radius <= 0:
-            ai_paddle.score += 1
-            ball.reset_position()
-
-        if ball.x + ball.radius >= WIDTH:
-            player_paddle.score += 1
-            ball.reset_position()
-
-        # Check for win condition
-        if player_paddle.score == win_score or ai_paddle.score == win_score:
-            winner = "Player" if player_paddle.score == win_score else "AI"
-            print(f"{winner} wins!")
-            running = False
-
-        # Draw everything
-        player_paddle.draw()
-        ai_paddle.draw()
-        ball.draw()
-        draw_score(player_paddle, ai_paddle)
+        profiler.start_frame()
 
         # Handle game events
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
                 running = False
+            elif event.type == pygame.KEYDOWN and event.key == pygame.K_F3:
+                renderer.toggle_overlay()
+        profiler.mark('events')
+
+        # Run however many fixed ticks the real time since the last frame covers
+        elapsed = clock.tick(fps) / 1000 * speed
+        profiler.mark('idle')
+        key_move = read_move()
+        profiler.mark('input')
+        ticks = 0
+        for ticks in range(1, scheduler.ticks(elapsed) + 1):
+            move = next(moves, None) if replay is not None else key_move
+            if move is None:
+                running = False  # End of the recording
+                break
+            if recorder:
+                recorder.record(move)
+            advance(state, move)
+            if state.winner is not None:
+                break
+        profiler.mark('simulate')
+
+        # Check for win condition
+        if state.winner is not None:
+            print(f"{state.winner} wins!")
+            running = False
 
-        pygame.display.flip()
-        clock.tick(60)  # Limit frame rate to 60 FPS
+        renderer.draw(state, profiler)
+        profiler.mark('draw')
+        renderer.present()
+        profiler.mark('present')
+        profiler.end_frame(ticks)
 
+    if recorder:
+        recorder.close(state)
+    if profile:
+        profiler.dump(profile)
     pygame.quit()
 
 if __name__ == "__main__":
-    main()
-
+    parser = argparse.ArgumentParser(description="Play SuperHot Pong against the AI.")
+    parser.add_argument("--ai", choices=["chase", *AI_DIFFICULTIES], default="chase",
+                        help="opponent: the original ball-chasing AI or a predictive AI level")
+    parser.add_argument("--seed", type=int, help="seed for the match's serves")
+    parser.add_argument("--record", metavar="PATH", help="write the match's input to a replay file")
+    parser.add_argument("--replay", metavar="PATH", help="show a recorded match instead of playing")
+    parser.add_argument("--speed", type=float, default=1.0, help="replay speed multiplier (default 1)")
+    parser.add_argument("--fps", type=int, default=TICK_RATE, help="frame rate cap (default 60)")
+    parser.add_argument("--profile", metavar="PATH", help="write frame timings to a .csv or .json file at exit")
+    args = parser.parse_args()
+    main(None if args.ai == "chase" else PredictiveAI.from_difficulty(args.ai), args.seed,
+         args.record, Replay.load(args.replay) if args.replay else None, args.speed, args.fps, args.profile)